@@ -1,8 +1,8 @@
 import streamlit as st
 import pandas as pd
-import joblib
-import os
-import catboost
+
+import metrics
+from bundle import load_serving_bundle
 
 # Page config
 st.set_page_config(
@@ -11,12 +11,20 @@ st.set_page_config(
     layout="wide"
 )
 
+# Scrape endpoint for the stage timings, only when MHP_METRICS=1 (started once per process)
+if metrics.ENABLED:
+    metrics.start_http_server()
+
 # Load the model
 @st.cache_resource
 def load_model():
-    model_path = os.path.join(os.path.dirname(__file__), '..', 'models', 'mental_health_classifier_v1.joblib')
-    print(f"Loading model from: {model_path}")
-    return joblib.load(model_path)
+    # Prefers the compiled bundle (NumPy only, no catboost import) while it matches the CatBoost one.
+    # This body only runs on a cache miss, i.e. the first call in this process
+    metrics.increment('model_cache_misses_total')
+    with metrics.stage('first_load_model'):
+        bundle, bundle_path = load_serving_bundle()
+    print(f"Loaded model bundle from: {bundle_path}")
+    return bundle
 
 def main():
     st.title("🧠 Mental Health Depression Predictor")
@@ -35,7 +43,7 @@ def main():
         st.subheader("Professional Information")
         status = st.selectbox("Status", ["Working Professional", "Student"])
         profession = st.text_input("Profession (if Working Professional)")
-        degree = st.selectbox("Degree", ["Undergraduate", "BSc", "MSc", "Ph.D", "Other"])
+        degree = st.selectbox("Degree", ["Undergraduate", "BSc", "MSc", "PhD", "Other"])
         work_study_hours = st.number_input("Work/Study Hours per day", min_value=0, max_value=24, value=8)
 
     st.subheader("Health & Lifestyle")
@@ -68,53 +76,43 @@ def main():
 
     # Prediction button
     if st.button("Predict", type="primary"):
-        # Create features dictionary
-        features = {
-            'Gender': 1 if gender == "Male" else 0,
-            'Age': age,
-            'City': hash(city) % 10000,  # Convert city to numeric hash
-            'Working Professional or Student': 1 if status == "Working Professional" else 0,
-            'Profession': hash(profession) % 10000 if profession else 0,  # Convert profession to numeric hash
-            'Academic Pressure': float(academic_pressure) if academic_pressure is not None else 0.0,
-            'Work Pressure': float(work_pressure) if work_pressure is not None else 0.0,
-            'CGPA': float(cgpa) if cgpa is not None else 0.0,
-            'Study Satisfaction': float(study_satisfaction) if study_satisfaction is not None else 0.0,
-            'Job Satisfaction': float(job_satisfaction) if job_satisfaction is not None else 0.0,
-            'Sleep Duration': {
-                'Less than 5 hours': 0,
-                '5-6 hours': 1,
-                '6-8 hours': 2,
-                'More than 8 hours': 3
-            }[sleep_duration],
-            'Dietary Habits': {
-                'Healthy': 0,
-                'Moderate': 1,
-                'Unhealthy': 2
-            }[dietary_habits],
-            'Degree': {
-                'Undergraduate': 0,
-                'BSc': 1,
-                'MSc': 2,
-                'PhD': 3,
-                'Other': 4
-            }[degree],
-            'Have you ever had suicidal thoughts ?': 1 if suicidal_thoughts == "Yes" else 0,
-            'Work/Study Hours': float(work_study_hours),
-            'Financial Stress': float(financial_stress),
-            'Family History of Mental Illness': 1 if family_history == "Yes" else 0
-        }
-        
-        # Create DataFrame and ensure all values are numeric
-        df = pd.DataFrame([features])
-        df = df.apply(pd.to_numeric, errors='coerce')
+        # Raw record in the training schema; the bundle cleans and encodes it
+        with metrics.stage('build_features'):
+            record = {
+                'Gender': gender,
+                'Age': age,
+                'City': city,
+                'Working Professional or Student': status,
+                'Profession': profession or None,
+                'Academic Pressure': academic_pressure,
+                'Work Pressure': work_pressure,
+                'CGPA': cgpa,
+                'Study Satisfaction': study_satisfaction,
+                'Job Satisfaction': job_satisfaction,
+                'Sleep Duration': sleep_duration,
+                'Dietary Habits': dietary_habits,
+                'Degree': degree,
+                'Have you ever had suicidal thoughts ?': suicidal_thoughts,
+                'Work/Study Hours': work_study_hours,
+                'Financial Stress': financial_stress,
+                'Family History of Mental Illness': family_history
+            }
+            frame = pd.DataFrame([record])
 
-        # Fill any NaN values with 0
-        df = df.fillna(0)
-        
         # Load model and make prediction
-        model = load_model()
-        prediction = model.predict(df)[0]
-        probability = model.predict_proba(df)[0][1]
+        metrics.increment('model_cache_lookups_total')
+        try:
+            bundle = load_model()
+        except FileNotFoundError:
+            # The bundle is built from data/train.csv, which is not shipped with the repo
+            st.error("No model bundle found at `models/mental_health_bundle_v1.joblib`. "
+                     "Build it from the training data and the saved model, then press Predict again:")
+            st.code("cd app\npython bundle.py --train ../data/train.csv "
+                    "--model ../models/mental_health_classifier_v1.joblib", language='bash')
+            st.stop()
+        with metrics.profile_request('predict'):
+            probability = bundle.predict_proba(frame)[0]
+            prediction = int(probability > 0.5)
         
         # Show prediction
         st.divider()
@@ -150,4 +148,7 @@ def main():
     """, unsafe_allow_html=True)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    # Streamlit re-executes the whole script on every widget interaction
+    metrics.increment('reruns_total')
+    with metrics.stage('rerun'):
+        main() 
\ No newline at end of file
@@ -0,0 +1,128 @@
+"""Versioned inference bundle: cleaning statistics, encoders, feature order and model.
+
+Build a bundle from the training data and the model saved by the notebook:
+
+    python app/bundle.py --train data/train.csv \
+        --model models/mental_health_classifier_v1.joblib \
+        --output models/mental_health_bundle_v1.joblib
+"""
+import argparse
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+
+import metrics
+from feature_cache import file_digest
+from preprocessing import CleaningTransformer, FeatureEncoder
+
+BUNDLE_FORMAT = 1
+MODEL_DIR = os.path.join(os.path.dirname(__file__), '..', 'models')
+DEFAULT_BUNDLE_PATH = os.path.join(MODEL_DIR, 'mental_health_bundle_v1.joblib')
+# Same bundle with the CatBoost model replaced by the NumPy evaluator (see tree_eval.py)
+COMPILED_BUNDLE_PATH = os.path.join(MODEL_DIR, 'mental_health_bundle_v1_compiled.joblib')
+
+
+class InferenceBundle:
+    """Everything needed to go from raw records to a depression probability."""
+
+    def __init__(self, cleaner, encoder, model, version='v1', metadata=None):
+        self.cleaner = cleaner
+        self.encoder = encoder
+        self.model = model
+        self.version = version
+        self.metadata = dict(metadata or {})
+
+    @property
+    def feature_names(self):
+        return self.encoder.feature_names_
+
+    @classmethod
+    def fit(cls, train_df, model, version='v1', metadata=None):
+        """Fit the cleaning and encoding steps on the raw training frame."""
+        cleaner = CleaningTransformer().fit(train_df)
+        encoder = FeatureEncoder().fit(cleaner.transform(train_df))
+        return cls(cleaner, encoder, model, version=version, metadata=metadata)
+
+    def transform(self, raw):
+        """Clean and encode a frame of raw records into the model's input matrix."""
+        with metrics.stage('clean'):
+            cleaned = self.cleaner.transform(raw)
+        with metrics.stage('encode'):
+            return self.encoder.transform(cleaned)
+
+    def predict_proba(self, raw):
+        """Return the probability of depression for every row of `raw`."""
+        features = self.transform(raw)
+        with metrics.stage('model_predict_proba'):
+            return self.model.predict_proba(features)[:, 1]
+
+    def predict(self, raw, threshold=0.5):
+        return (self.predict_proba(raw) > threshold).astype(int)
+
+    def save(self, path):
+        joblib.dump({
+            'format': BUNDLE_FORMAT,
+            'version': self.version,
+            'metadata': self.metadata,
+            'cleaner': self.cleaner,
+            'encoder': self.encoder,
+            'model': self.model,
+        }, path)
+        print(f"Bundle saved to {path}")
+
+    @classmethod
+    def load(cls, path=DEFAULT_BUNDLE_PATH):
+        metrics.increment('model_loads_total')
+        with metrics.stage('model_load'):
+            payload = joblib.load(path)
+        if payload.get('format') != BUNDLE_FORMAT:
+            raise ValueError(
+                f"Unsupported bundle format {payload.get('format')!r} in {path}, expected {BUNDLE_FORMAT}"
+            )
+        return cls(
+            payload['cleaner'], payload['encoder'], payload['model'],
+            version=payload['version'], metadata=payload['metadata']
+        )
+
+
+def load_serving_bundle(path=DEFAULT_BUNDLE_PATH, compiled_path=COMPILED_BUNDLE_PATH):
+    """Load the compiled bundle if it was exported from the bundle at `path`, else `path` itself.
+
+    Returns the bundle and the path it came from. A compiled bundle whose
+    recorded source hash no longer matches `path` (the bundle was rebuilt
+    after the export) is ignored rather than served with stale trees.
+    """
+    if os.path.exists(compiled_path):
+        compiled = InferenceBundle.load(compiled_path)
+        if not os.path.exists(path) or compiled.metadata.get('source_sha256') == file_digest(path):
+            return compiled, compiled_path
+        print(f"Ignoring {compiled_path}: it was not exported from the current {os.path.basename(path)}, "
+              "re-run tree_eval.py to refresh it")
+    return InferenceBundle.load(path), path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the inference bundle used by the app.')
+    parser.add_argument('--train', required=True, help='path to the raw train.csv')
+    parser.add_argument('--model', required=True, help='fitted model saved with joblib')
+    parser.add_argument('--output', default=DEFAULT_BUNDLE_PATH)
+    parser.add_argument('--version', default='v1')
+    args = parser.parse_args()
+
+    train_df = pd.read_csv(args.train)
+    model = joblib.load(args.model)
+    bundle = InferenceBundle.fit(
+        train_df, model, version=args.version,
+        metadata={'train_rows': len(train_df), 'model_path': os.path.basename(args.model)}
+    )
+
+    # The model must accept the bundle's feature layout
+    sample = bundle.predict_proba(train_df.head(5))
+    assert np.all((sample >= 0) & (sample <= 1))
+    bundle.save(args.output)
+
+
+if __name__ == '__main__':
+    main()
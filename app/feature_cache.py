@@ -0,0 +1,191 @@
+"""On-disk cache of cleaned and encoded features, keyed on the raw CSV content.
+
+The first call for a CSV runs the cleaning and encoding steps and writes one
+`.npy` file per column: int8/int16 codes for the label-encoded columns,
+float32 for the scaled numerics, int8 for the target. Later calls memory-map
+those files (zero-copy). The key is a hash of the raw file plus a hash of
+the cleaning/encoding code, so editing either rebuilds the entry.
+
+    from feature_cache import FeatureCache
+
+    cache = FeatureCache()
+    train = cache.load('../data/train.csv')
+    test = cache.load('../data/test.csv', reference=train)  # encoded with train statistics
+    X, y = train.to_frame(), train.target
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import joblib
+import numpy as np
+import pandas as pd
+
+import metrics
+import preprocessing
+from preprocessing import (
+    CATEGORICAL_COLUMNS,
+    NUMERICAL_COLUMNS,
+    TARGET_COLUMN,
+    CleaningTransformer,
+    FeatureEncoder,
+)
+
+CACHE_FORMAT = 1
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(__file__), '..', 'data', 'cache')
+
+
+def file_digest(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def code_version():
+    """Hash of the cleaning/encoding source, so logic changes invalidate the cache."""
+    digest = hashlib.sha256(f'format={CACHE_FORMAT}'.encode())
+    with open(preprocessing.__file__, 'rb') as f:
+        digest.update(f.read())
+    return digest.hexdigest()
+
+
+def code_dtype(n_codes):
+    # Codes run from 0 to len(classes), the last one reserved for unseen categories
+    return np.int8 if n_codes <= np.iinfo(np.int8).max else np.int16
+
+
+class CachedFeatures:
+    """Memory-mapped columns of one cache entry plus the transformers that produced them."""
+
+    def __init__(self, key, path, columns, ids, target, cleaner, encoder):
+        self.key = key
+        self.path = path
+        self.columns = columns
+        self.ids = ids
+        self.target = target
+        self.cleaner = cleaner
+        self.encoder = encoder
+
+    @property
+    def feature_names(self):
+        return self.encoder.feature_names_
+
+    def __len__(self):
+        return len(self.ids)
+
+    def to_frame(self):
+        """Feature frame in model column order, backed by the memory-mapped arrays."""
+        return pd.DataFrame({name: self.columns[name] for name in self.feature_names}, copy=False)
+
+    def to_numpy(self, dtype=np.float32):
+        """Dense (n_rows, n_features) matrix, for libraries that need a single array."""
+        matrix = np.empty((len(self), len(self.feature_names)), dtype=dtype)
+        for i, name in enumerate(self.feature_names):
+            matrix[:, i] = self.columns[name]
+        return matrix
+
+
+class FeatureCache:
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+
+    def key(self, csv_path, reference=None):
+        return self._key(file_digest(csv_path), reference)
+
+    def _key(self, source_digest, reference):
+        digest = hashlib.sha256()
+        digest.update(source_digest.encode())
+        digest.update(code_version().encode())
+        if reference is not None:
+            # Test features depend on the statistics fitted on the training file
+            digest.update(reference.key.encode())
+        return digest.hexdigest()[:16]
+
+    def load(self, csv_path, reference=None, rebuild=False):
+        """Return the cached features for `csv_path`, building them on a miss.
+
+        Without `reference` the cleaning and encoding are fitted on this
+        file (the training set); with it, the reference entry's fitted
+        transformers are reused (the test set).
+        """
+        source_digest = file_digest(csv_path)
+        key = self._key(source_digest, reference)
+        path = os.path.join(self.cache_dir, key)
+        if rebuild or not os.path.exists(os.path.join(path, 'meta.json')):
+            metrics.increment('feature_cache_misses_total')
+            with metrics.stage('feature_cache_build'):
+                self._build(csv_path, source_digest, path, reference)
+        else:
+            metrics.increment('feature_cache_hits_total')
+        return self._open(key, path)
+
+    def _build(self, csv_path, source_digest, path, reference):
+        raw = pd.read_csv(csv_path)
+        if reference is None:
+            cleaner = CleaningTransformer().fit(raw)
+            cleaned = cleaner.transform(raw)
+            encoder = FeatureEncoder().fit(cleaned)
+        else:
+            cleaner, encoder = reference.cleaner, reference.encoder
+            cleaned = cleaner.transform(raw)
+        encoded = encoder.transform(cleaned)
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        staging = tempfile.mkdtemp(dir=self.cache_dir, prefix='.building-')
+        try:
+            dtypes = {}
+            for i, name in enumerate(encoder.feature_names_):
+                if name in CATEGORICAL_COLUMNS:
+                    dtype = code_dtype(encoder.unseen_code_[name])
+                else:
+                    dtype = np.float32
+                np.save(os.path.join(staging, f'{i:02d}.npy'), encoded[:, i].astype(dtype))
+                dtypes[name] = np.dtype(dtype).name
+            np.save(os.path.join(staging, 'id.npy'), raw['id'].to_numpy(dtype=np.int64))
+            has_target = TARGET_COLUMN in raw
+            if has_target:
+                np.save(os.path.join(staging, 'target.npy'), raw[TARGET_COLUMN].to_numpy(dtype=np.int8))
+            joblib.dump({'cleaner': cleaner, 'encoder': encoder}, os.path.join(staging, 'transformers.joblib'))
+
+            meta = {
+                'format': CACHE_FORMAT,
+                'source': os.path.basename(csv_path),
+                'source_sha256': source_digest,
+                'code_version': code_version(),
+                'reference': reference.key if reference is not None else None,
+                'rows': len(raw),
+                'features': encoder.feature_names_,
+                'dtypes': dtypes,
+                'numerical': NUMERICAL_COLUMNS,
+                'has_target': has_target,
+            }
+            with open(os.path.join(staging, 'meta.json'), 'w') as f:
+                json.dump(meta, f, indent=2)
+
+            # Publish the entry in one step so a crash never leaves a half-written cache
+            if os.path.exists(path):
+                shutil.rmtree(path)
+            os.replace(staging, path)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+    def _open(self, key, path):
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+        columns = {
+            name: np.load(os.path.join(path, f'{i:02d}.npy'), mmap_mode='r')
+            for i, name in enumerate(meta['features'])
+        }
+        ids = np.load(os.path.join(path, 'id.npy'), mmap_mode='r')
+        target = np.load(os.path.join(path, 'target.npy'), mmap_mode='r') if meta['has_target'] else None
+        transformers = joblib.load(os.path.join(path, 'transformers.joblib'))
+        return CachedFeatures(key, path, columns, ids, target,
+                              transformers['cleaner'], transformers['encoder'])
+
+    def clear(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
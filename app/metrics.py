@@ -0,0 +1,273 @@
+"""Low-overhead latency histograms, counters and slow-request profiling.
+
+Instrumentation is off unless `MHP_METRICS=1` is set (or `enable()` is
+called). While off, `stage()` hands back one shared no-op context manager
+and `increment()` returns immediately, so instrumented code pays a single
+attribute check per call.
+
+    from metrics import stage, increment
+
+    with stage('predict_proba'):
+        ...
+    increment('model_loads_total')
+
+Timings go into fixed-bucket histograms per stage. `render_prometheus()`
+and `snapshot()` expose them as Prometheus text or JSON, and
+`start_http_server()` serves both (`/metrics`, `/metrics.json`) plus
+the slow-request profiles (`/profiles.json`) from a daemon thread on
+`MHP_METRICS_PORT` (default 9108).
+
+With `MHP_PROFILE_SLOW_MS` set, a sampled fraction (`MHP_PROFILE_SAMPLE_RATE`,
+default 0.1) of `profile_request()` blocks run a stack sampler thread; when
+the block takes longer than the threshold, its aggregated stacks are kept
+in a small ring buffer.
+"""
+import json
+import os
+import random
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, deque
+from contextlib import contextmanager, nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PREFIX = 'mhp'
+# Upper bounds in seconds, from 100 µs to 10 s
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+           0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+ENABLED = os.environ.get('MHP_METRICS', '') not in ('', '0', 'false')
+PROFILE_SLOW_SECONDS = float(os.environ.get('MHP_PROFILE_SLOW_MS', 0)) / 1000.0
+PROFILE_SAMPLE_RATE = float(os.environ.get('MHP_PROFILE_SAMPLE_RATE', 0.1))
+PROFILE_INTERVAL = 0.005
+METRICS_PORT = int(os.environ.get('MHP_METRICS_PORT', 9108))
+
+_NOOP = nullcontext()
+_lock = threading.Lock()
+_histograms = {}
+_counters = Counter()
+_profiles = deque(maxlen=20)
+_server = None
+_server_failed = False
+
+
+class Histogram:
+    """Cumulative-style histogram with fixed bucket bounds."""
+
+    __slots__ = ('counts', 'sum', 'count')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class _Timer:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, time.perf_counter() - self.start)
+        return False
+
+
+def enable(profile_slow_ms=None, sample_rate=None):
+    global ENABLED, PROFILE_SLOW_SECONDS, PROFILE_SAMPLE_RATE
+    ENABLED = True
+    if profile_slow_ms is not None:
+        PROFILE_SLOW_SECONDS = profile_slow_ms / 1000.0
+    if sample_rate is not None:
+        PROFILE_SAMPLE_RATE = sample_rate
+
+
+def disable():
+    global ENABLED
+    ENABLED = False
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+        _profiles.clear()
+
+
+def stage(name):
+    """Context manager timing one pass through the `name` stage."""
+    if not ENABLED:
+        return _NOOP
+    return _Timer(name)
+
+
+def observe(name, seconds):
+    if not ENABLED:
+        return
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = Histogram()
+        histogram.observe(seconds)
+
+
+def increment(name, value=1):
+    if not ENABLED:
+        return
+    with _lock:
+        _counters[name] += value
+
+
+def merge(data):
+    """Add a `snapshot()` taken in another process (e.g. a pool worker) to this one."""
+    with _lock:
+        for name, h in data['stages'].items():
+            histogram = _histograms.get(name)
+            if histogram is None:
+                histogram = _histograms[name] = Histogram()
+            histogram.counts = [a + b for a, b in zip(histogram.counts, h['counts'])]
+            histogram.sum += h['sum']
+            histogram.count += h['count']
+        _counters.update(data['counters'])
+
+
+class _StackSampler(threading.Thread):
+    """Samples one thread's Python stack at a fixed interval until stopped."""
+
+    def __init__(self, thread_id):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.stacks = Counter()
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(PROFILE_INTERVAL):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}')
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+
+@contextmanager
+def profile_request(name):
+    """Time the `name` stage and keep a stack profile if it turns out to be slow."""
+    if not ENABLED:
+        yield
+        return
+    sampler = None
+    if PROFILE_SLOW_SECONDS > 0 and random.random() < PROFILE_SAMPLE_RATE:
+        sampler = _StackSampler(threading.get_ident())
+        sampler.start()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        observe(name, elapsed)
+        if sampler is not None:
+            sampler.stopped.set()
+            sampler.join()
+            if elapsed >= PROFILE_SLOW_SECONDS:
+                with _lock:
+                    _profiles.append({
+                        'stage': name,
+                        'seconds': elapsed,
+                        'time': time.time(),
+                        'samples': sampler.stacks.most_common(25),
+                    })
+
+
+def snapshot():
+    """All metrics as a JSON-serialisable dict."""
+    with _lock:
+        return {
+            'enabled': ENABLED,
+            'buckets': list(BUCKETS),
+            'stages': {
+                name: {'count': h.count, 'sum': h.sum, 'counts': list(h.counts)}
+                for name, h in _histograms.items()
+            },
+            'counters': dict(_counters),
+        }
+
+
+def profiles():
+    with _lock:
+        return list(_profiles)
+
+
+def render_prometheus():
+    """All metrics in the Prometheus text exposition format."""
+    data = snapshot()
+    lines = [
+        f'# HELP {PREFIX}_stage_duration_seconds Time spent in each prediction stage.',
+        f'# TYPE {PREFIX}_stage_duration_seconds histogram',
+    ]
+    for name, h in sorted(data['stages'].items()):
+        cumulative = 0
+        for bound, count in zip(list(BUCKETS) + ['+Inf'], h['counts']):
+            cumulative += count
+            lines.append(f'{PREFIX}_stage_duration_seconds_bucket{{stage="{name}",le="{bound}"}} {cumulative}')
+        lines.append(f'{PREFIX}_stage_duration_seconds_sum{{stage="{name}"}} {h["sum"]}')
+        lines.append(f'{PREFIX}_stage_duration_seconds_count{{stage="{name}"}} {h["count"]}')
+    for name, value in sorted(data['counters'].items()):
+        lines.append(f'# TYPE {PREFIX}_{name} counter')
+        lines.append(f'{PREFIX}_{name} {value}')
+    return '\n'.join(lines) + '\n'
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == '/metrics':
+            body, content_type = render_prometheus(), 'text/plain; version=0.0.4'
+        elif self.path == '/metrics.json':
+            body, content_type = json.dumps(snapshot()), 'application/json'
+        elif self.path == '/profiles.json':
+            body, content_type = json.dumps(profiles()), 'application/json'
+        else:
+            self.send_error(404)
+            return
+        data = body.encode()
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_http_server(port=METRICS_PORT, host='127.0.0.1'):
+    """Serve the metrics endpoints from a daemon thread (once per process).
+
+    Returns None, after one warning on stderr, if the port can't be bound
+    (e.g. a second app instance already holds it); metrics keep recording.
+    """
+    global _server, _server_failed
+    with _lock:
+        if _server is None and not _server_failed:
+            try:
+                _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            except OSError as exc:
+                _server_failed = True
+                print(f"Metrics endpoint disabled: cannot listen on {host}:{port} ({exc}); "
+                      "set MHP_METRICS_PORT to another port", file=sys.stderr)
+                return None
+            threading.Thread(target=_server.serve_forever, daemon=True).start()
+    return _server
@@ -0,0 +1,338 @@
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
+
+STATUS_COLUMN = 'Working Professional or Student'
+STUDENT = 'Student'
+WORKING_PROFESSIONAL = 'Working Professional'
+
+TARGET_COLUMN = 'Depression'
+DROP_COLUMNS = ['id', 'Name']
+
+CATEGORICAL_COLUMNS = [
+    'Gender',
+    'City',
+    'Working Professional or Student',
+    'Profession',
+    'Sleep Duration',
+    'Dietary Habits',
+    'Degree',
+    'Have you ever had suicidal thoughts ?',
+    'Family History of Mental Illness'
+]
+
+NUMERICAL_COLUMNS = [
+    'Age',
+    'Academic Pressure',
+    'Work Pressure',
+    'CGPA',
+    'Study Satisfaction',
+    'Job Satisfaction',
+    'Work/Study Hours',
+    'Financial Stress'
+]
+
+# Column order of the model's input, as produced by prepare_data_for_ml
+FEATURE_COLUMNS = [
+    'Gender', 'Age', 'City', 'Working Professional or Student', 'Profession',
+    'Academic Pressure', 'Work Pressure', 'CGPA', 'Study Satisfaction',
+    'Job Satisfaction', 'Sleep Duration', 'Dietary Habits', 'Degree',
+    'Have you ever had suicidal thoughts ?', 'Work/Study Hours',
+    'Financial Stress', 'Family History of Mental Illness'
+]
+
+# List of valid professions
+VALID_PROFESSIONS = [
+    'Chef', 'Teacher', 'Business Analyst', 'Financial Analyst', 'Chemist',
+    'Electrician', 'Software Engineer', 'Data Scientist', 'Plumber',
+    'Marketing Manager', 'Accountant', 'Entrepreneur', 'HR Manager',
+    'UX/UI Designer', 'Content Writer', 'Educational Consultant',
+    'Civil Engineer', 'Manager', 'Pharmacist', 'Architect',
+    'Mechanical Engineer', 'Customer Support', 'Consultant', 'Judge',
+    'Researcher', 'Pilot', 'Graphic Designer', 'Travel Consultant',
+    'Digital Marketer', 'Lawyer', 'Research Analyst', 'Sales Executive',
+    'Doctor', 'Investment Banker', 'Family Consultant', 'City Manager',
+    'Medical Doctor', 'Analyst', 'Unemployed', 'Professor', 'Academia'
+]
+
+# Dictionary for standardizing profession names
+PROFESSION_STANDARDIZATION = {
+    'Finanancial Analyst': 'Financial Analyst',  # Fix spelling error
+    'Medical Doctor': 'Doctor',                  # Standardize Doctor terms
+    'Academic': 'Academia',                      # Standardize Academic to Academia
+    'Profession': 'Professor',                   # Convert Profession to Professor
+}
+
+DIETARY_MAPPING = {
+    'Moderate': 'Moderate',
+    'Unhealthy': 'Unhealthy',
+    'Healthy': 'Healthy',
+    'More Healthy': 'Healthy',
+    'No Healthy': 'Unhealthy',
+    'Less Healthy': 'Unhealthy',
+    'Less than Healthy': 'Unhealthy',
+    'Yes': 'Moderate',  # Assuming 'Yes' without context should be Moderate
+    'No': 'Unhealthy'  # Assuming 'No' without context should be Unhealthy
+}
+
+DEGREE_MAPPING = {
+    # Bachelor's Degrees
+    'B.Tech': 'B.Tech', 'BE': 'B.Tech', 'BTech': 'B.Tech', 'E.Tech': 'B.Tech',
+    'BBA': 'BBA', 'B BA': 'BBA', 'BB': 'BBA', 'B B.Com': 'B.Com',
+    'B.Com': 'B.Com', 'BCom': 'B.Com',
+    'BCA': 'BCA', 'LCA': 'BCA', 'HCA': 'BCA', 'RCA': 'BCA',
+    'BSc': 'B.Sc', 'B.Sc': 'B.Sc',
+    'B.Arch': 'B.Arch', 'BArch': 'B.Arch', 'B.B.Arch': 'B.Arch', 'S.Arch': 'B.Arch',
+    'B.Pharm': 'B.Pharm', 'BPharm': 'B.Pharm', 'H_Pharm': 'B.Pharm',
+    'P.Pharm': 'B.Pharm', 'S.Pharm': 'B.Pharm', 'N.Pharm': 'B.Pharm',
+    'BHM': 'BHM', 'LHM': 'BHM',
+    'B.Ed': 'B.Ed', 'BEd': 'B.Ed', 'L.Ed': 'B.Ed', 'K.Ed': 'B.Ed', 'LLEd': 'B.Ed',
+    'BA': 'BA',
+    'LLB': 'LLB', 'LL B.Ed': 'LLB', 'LLBA': 'LLB', 'LLS': 'LLB',
+
+    # Master's Degrees
+    'M.Tech': 'M.Tech', 'ME': 'M.Tech', 'MTech': 'M.Tech', 'M_Tech': 'M.Tech',
+    'MBA': 'MBA', 'M. Business Analyst': 'MBA',
+    'MCA': 'MCA',
+    'M.Com': 'M.Com', 'MCom': 'M.Com', 'LL.Com': 'M.Com', 'LLCom': 'M.Com', 'P.Com': 'M.Com',
+    'MSc': 'M.Sc', 'M.S': 'M.Sc',
+    'M.Pharm': 'M.Pharm', 'MPharm': 'M.Pharm',
+    'M.Ed': 'M.Ed', 'MEd': 'M.Ed',
+    'M.Arch': 'M.Arch',
+    'MA': 'MA',
+    'MHM': 'MHM',
+    'LLM': 'LLM', 'LLTech': 'LLM',
+
+    # Doctorate
+    'PhD': 'PhD',
+
+    # Medical
+    'MBBS': 'MBBS', 'MD': 'MD',
+
+    # Others
+    'Class 12': 'Class 12', 'Class 11': 'Class 11'
+}
+
+
+def standardize_diet(value):
+    """Map a single raw 'Dietary Habits' value to Healthy/Moderate/Unhealthy."""
+    if pd.isna(value):
+        return 'Moderate'  # Fill missing values with most common category
+
+    # Numeric values are assumed to be Moderate
+    if isinstance(value, (int, float)):
+        return 'Moderate'
+
+    return DIETARY_MAPPING.get(str(value).strip(), 'Moderate')
+
+
+def standardize_degree(value):
+    """Map a single raw 'Degree' value to its standardized title."""
+    if pd.isna(value):
+        return 'Unknown'
+
+    value = str(value).strip()
+
+    # Numbers (including floats) are not degrees
+    if value.replace('.', '').isdigit():
+        return 'Unknown'
+
+    return DEGREE_MAPPING.get(value, 'Unknown')
+
+
+def map_categories(series, func):
+    """Apply a scalar cleaning function once per distinct value of `series`.
+
+    The column is factorized into integer codes, `func` runs over the
+    (small) set of categories, and the result is gathered back with the
+    codes, so the cost no longer scales with the number of rows.
+    """
+    codes, categories = pd.factorize(series, use_na_sentinel=True)
+    # Missing values get code -1, which picks up the last slot
+    lookup = np.array([func(value) for value in categories] + [func(np.nan)], dtype=object)
+    return pd.Series(lookup[codes], index=series.index, name=series.name)
+
+
+# Group-mean fill values: (attribute, status group it is computed over, column)
+GROUP_STATISTICS = [
+    ('student_academic_pressure_mean_', STUDENT, 'Academic Pressure'),
+    ('working_work_pressure_mean_', WORKING_PROFESSIONAL, 'Work Pressure'),
+    ('student_cgpa_mean_', STUDENT, 'CGPA'),
+    ('working_cgpa_mean_', WORKING_PROFESSIONAL, 'CGPA'),
+    ('study_satisfaction_mean_', STUDENT, 'Study Satisfaction'),
+    ('job_satisfaction_mean_', WORKING_PROFESSIONAL, 'Job Satisfaction'),
+]
+
+
+class CleaningTransformer(BaseEstimator, TransformerMixin):
+    """Vectorized version of the notebook's data-cleaning steps.
+
+    `fit` learns the status-group means (and the Financial Stress mode) from
+    the training frame; `transform` applies them with boolean masks so the
+    same statistics are reused on the test frame. The means are kept as
+    running sums and counts, so `partial_fit` can fold in new labelled
+    batches without revisiting the old data. `fit_transform` on a frame
+    gives the same output as running `clean_profession`,
+    `fill_pressure_columns`, `fill_cgpa_by_status`,
+    `fill_satisfaction_columns`, `clean_dietary_habits`, `clean_degree` and
+    the Financial Stress mode fill on that frame in the notebook.
+    """
+
+    def fit(self, X, y=None):
+        self.sums_ = {name: 0.0 for name, _, _ in GROUP_STATISTICS}
+        self.counts_ = {name: 0 for name, _, _ in GROUP_STATISTICS}
+        self.financial_stress_counts_ = {}
+        return self.partial_fit(X)
+
+    def partial_fit(self, X, y=None):
+        """Fold a new batch into the running sums and counts behind the fill values.
+
+        After `fit(a)` then `partial_fit(b)` the statistics match `fit(concat([a, b]))`
+        up to floating-point rounding.
+        """
+        if not hasattr(self, 'sums_'):
+            raise ValueError('partial_fit needs a transformer fitted with running aggregates, refit it with fit()')
+        status = X[STATUS_COLUMN]
+        groups = {STUDENT: (status == STUDENT).to_numpy(),
+                  WORKING_PROFESSIONAL: (status == WORKING_PROFESSIONAL).to_numpy()}
+        for name, group, column in GROUP_STATISTICS:
+            values = X.loc[groups[group], column]
+            self.sums_[name] += float(values.sum())
+            self.counts_[name] += int(values.count())
+            setattr(self, name, self.sums_[name] / self.counts_[name] if self.counts_[name] else np.nan)
+
+        for value, count in X['Financial Stress'].value_counts().items():
+            self.financial_stress_counts_[value] = self.financial_stress_counts_.get(value, 0) + int(count)
+        # Like Series.mode()[0]: the most frequent value, the smallest one on ties
+        most = max(self.financial_stress_counts_.values())
+        self.financial_stress_mode_ = min(
+            value for value, count in self.financial_stress_counts_.items() if count == most
+        )
+        return self
+
+    def transform(self, X):
+        df = X.copy()
+
+        status = df[STATUS_COLUMN]
+        is_student = (status == STUDENT).to_numpy()
+        is_working = (status == WORKING_PROFESSIONAL).to_numpy()
+
+        df['Profession'] = self._clean_profession(df['Profession'], is_student)
+
+        # Working professionals have no academic pressure, students no work pressure
+        academic = df['Academic Pressure'].to_numpy(dtype=float)
+        df['Academic Pressure'] = np.where(
+            is_working, 0.0,
+            np.where(np.isnan(academic), self.student_academic_pressure_mean_, academic)
+        )
+        work = df['Work Pressure'].to_numpy(dtype=float)
+        df['Work Pressure'] = np.where(
+            is_student, 0.0,
+            np.where(np.isnan(work), self.working_work_pressure_mean_, work)
+        )
+
+        # Missing CGPA is filled with the mean of the person's status group
+        cgpa = df['CGPA'].to_numpy(dtype=float)
+        missing = np.isnan(cgpa)
+        df['CGPA'] = np.where(
+            is_working & missing, self.working_cgpa_mean_,
+            np.where(is_student & missing, self.student_cgpa_mean_, cgpa)
+        )
+
+        # Missing satisfaction is the group mean, or the minimum (1) for the other group
+        min_value = 1
+        study = df['Study Satisfaction'].to_numpy(dtype=float)
+        missing = np.isnan(study)
+        df['Study Satisfaction'] = np.where(
+            is_student & missing, self.study_satisfaction_mean_,
+            np.where(missing, min_value, study)
+        )
+        job = df['Job Satisfaction'].to_numpy(dtype=float)
+        missing = np.isnan(job)
+        df['Job Satisfaction'] = np.where(
+            is_working & missing, self.job_satisfaction_mean_,
+            np.where(missing, min_value, job)
+        )
+
+        df['Dietary Habits'] = map_categories(df['Dietary Habits'], standardize_diet)
+        df['Degree'] = map_categories(df['Degree'], standardize_degree)
+        df['Financial Stress'] = df['Financial Stress'].fillna(self.financial_stress_mode_)
+
+        return df
+
+    @staticmethod
+    def _clean_profession(profession, is_student):
+        standardized = profession.map(PROFESSION_STANDARDIZATION).fillna(profession)
+        known = standardized.isin(VALID_PROFESSIONS + [STUDENT]).to_numpy()
+        cleaned = np.where(
+            is_student, STUDENT,
+            np.where(known, standardized.to_numpy(dtype=object), 'Unknown')
+        )
+        return pd.Series(cleaned, index=profession.index, name=profession.name)
+
+
+class FeatureEncoder(BaseEstimator, TransformerMixin):
+    """Compiled form of the notebook's LabelEncoders and StandardScaler.
+
+    Each categorical column is stored as a lookup table of its sorted
+    classes (the codes `LabelEncoder` would assign), and the scaler as its
+    `mean_`/`scale_` vectors. `transform` encodes a whole batch into a float
+    matrix in `FEATURE_COLUMNS` order. Categories not seen during fitting
+    get the reserved code `len(classes)` instead of growing the table.
+    """
+
+    def __init__(self, feature_names=None):
+        self.feature_names = feature_names
+
+    def fit(self, X, y=None):
+        self.feature_names_ = list(self.feature_names or FEATURE_COLUMNS)
+        self.classes_ = {
+            column: np.sort(pd.unique(X[column].to_numpy(dtype=object)))
+            for column in CATEGORICAL_COLUMNS
+        }
+        values = X[NUMERICAL_COLUMNS].to_numpy(dtype=float)
+        self.mean_ = np.nanmean(values, axis=0)
+        scale = np.nanstd(values, axis=0)
+        # StandardScaler leaves constant columns unscaled
+        self.scale_ = np.where(scale == 0, 1.0, scale)
+        self._compile()
+        return self
+
+    @classmethod
+    def from_sklearn(cls, label_encoders, scaler, feature_names):
+        """Build an encoder from the fitted objects returned by prepare_data_for_ml."""
+        encoder = cls(feature_names=feature_names)
+        encoder.feature_names_ = list(feature_names)
+        encoder.classes_ = {
+            column: np.asarray(label_encoders[column].classes_, dtype=object)
+            for column in CATEGORICAL_COLUMNS
+        }
+        encoder.mean_ = np.asarray(scaler.mean_, dtype=float)
+        encoder.scale_ = np.asarray(scaler.scale_, dtype=float)
+        encoder._compile()
+        return encoder
+
+    def _compile(self):
+        # Flat lookup tables: category -> code, plus the column position of every feature
+        self.lookup_ = {
+            column: pd.Index(classes, dtype=object) for column, classes in self.classes_.items()
+        }
+        self.unseen_code_ = {column: len(classes) for column, classes in self.classes_.items()}
+        position = {name: i for i, name in enumerate(self.feature_names_)}
+        self.categorical_positions_ = np.array([position[c] for c in CATEGORICAL_COLUMNS])
+        self.numerical_positions_ = np.array([position[c] for c in NUMERICAL_COLUMNS])
+
+    def transform(self, X):
+        encoded = np.empty((len(X), len(self.feature_names_)), dtype=float)
+
+        for column, target in zip(CATEGORICAL_COLUMNS, self.categorical_positions_):
+            codes = self.lookup_[column].get_indexer(X[column].to_numpy(dtype=object))
+            codes[codes < 0] = self.unseen_code_[column]
+            encoded[:, target] = codes
+
+        values = X[NUMERICAL_COLUMNS].to_numpy(dtype=float)
+        encoded[:, self.numerical_positions_] = (values - self.mean_) / self.scale_
+        return encoded
+
+    def get_feature_names_out(self, input_features=None):
+        return np.asarray(self.feature_names_, dtype=object)
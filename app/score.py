@@ -0,0 +1,155 @@
+"""Score a CSV of raw records in fixed-size chunks and write a Kaggle submission.
+
+    python app/score.py data/test.csv --output submission.csv --chunksize 20000 --workers 4
+
+Each chunk is cleaned and encoded with the statistics stored in the inference
+bundle, scored with a single `predict_proba` call, and written out as
+`id,Depression` rows before the next chunk is read, so memory use depends on
+the chunk size and not on the size of the input file.
+
+With `--metrics stats.json` the read, clean, encode, model and write stages
+are timed (see metrics.py) and written out as JSON when the run finishes.
+"""
+import argparse
+import json
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import metrics
+from bundle import DEFAULT_BUNDLE_PATH, InferenceBundle
+
+ID_COLUMN = 'id'
+TARGET_COLUMN = 'Depression'
+
+# Bundle loaded once per worker process by _init_worker
+_worker_bundle = None
+
+
+def score_chunk(bundle, chunk, threshold=0.5, with_probability=False):
+    """Return the submission rows for one chunk of raw records."""
+    metrics.increment('rows_scored_total', len(chunk))
+    probability = bundle.predict_proba(chunk)
+    result = pd.DataFrame({
+        ID_COLUMN: chunk[ID_COLUMN].to_numpy(),
+        TARGET_COLUMN: (probability > threshold).astype(np.int8),
+    })
+    if with_probability:
+        result['probability'] = probability
+    return result
+
+
+def _init_worker(bundle_path, collect_metrics=False):
+    global _worker_bundle
+    if collect_metrics:
+        # Forked workers inherit the parent's histograms; start from zero so merging doesn't double count
+        metrics.reset()
+        metrics.enable()
+    _worker_bundle = InferenceBundle.load(bundle_path)
+
+
+def _score_in_worker(chunk, threshold, with_probability):
+    with metrics.stage('score_chunk'):
+        result = score_chunk(_worker_bundle, chunk, threshold, with_probability)
+    if not metrics.ENABLED:
+        return result, None
+    # Timings recorded since the last chunk go back to the parent, which merges them
+    recorded = metrics.snapshot()
+    metrics.reset()
+    return result, recorded
+
+
+def read_chunks(path, chunksize):
+    # The Name column is never used by the model, so it is not parsed at all
+    reader = pd.read_csv(path, chunksize=chunksize, usecols=lambda column: column != 'Name')
+    with reader:
+        while True:
+            with metrics.stage('read_chunk'):
+                chunk = next(reader, None)
+            if chunk is None:
+                return
+            yield chunk
+
+
+def score_file(input_path, output, bundle_path=DEFAULT_BUNDLE_PATH, chunksize=10000,
+               workers=1, threshold=0.5, with_probability=False):
+    """Stream `input_path` through the model into the open file `output`.
+
+    With `workers > 1` chunks are scored in a process pool. At most two
+    chunks per worker are in flight at any time and results are written in
+    input order, so memory stays bounded either way. Returns the number of
+    rows written.
+    """
+    rows = 0
+    header = True
+
+    def write(result):
+        nonlocal rows, header
+        with metrics.stage('write_chunk'):
+            result.to_csv(output, header=header, index=False)
+        header = False
+        rows += len(result)
+
+    def collect(future):
+        result, worker_metrics = future.result()
+        if worker_metrics is not None:
+            metrics.merge(worker_metrics)
+        write(result)
+
+    if workers <= 1:
+        bundle = InferenceBundle.load(bundle_path)
+        for chunk in read_chunks(input_path, chunksize):
+            with metrics.stage('score_chunk'):
+                result = score_chunk(bundle, chunk, threshold, with_probability)
+            write(result)
+        return rows
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(bundle_path, metrics.ENABLED)) as executor:
+        pending = deque()
+        for chunk in read_chunks(input_path, chunksize):
+            pending.append(executor.submit(_score_in_worker, chunk, threshold, with_probability))
+            if len(pending) >= 2 * workers:
+                collect(pending.popleft())
+        while pending:
+            collect(pending.popleft())
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Write Kaggle-format predictions for a CSV of raw records.')
+    parser.add_argument('input', help='CSV with the same columns as test.csv')
+    parser.add_argument('--output', '-o', help='submission file to write (default: stdout)')
+    parser.add_argument('--bundle', default=DEFAULT_BUNDLE_PATH, help='inference bundle to score with')
+    parser.add_argument('--chunksize', type=int, default=10000, help='rows read and scored at a time')
+    parser.add_argument('--workers', type=int, default=1, help='processes used to score chunks')
+    parser.add_argument('--threshold', type=float, default=0.5)
+    parser.add_argument('--with-probability', action='store_true',
+                        help='add a probability column next to the predicted label')
+    parser.add_argument('--metrics', metavar='PATH', help='time every stage and write the histograms here as JSON')
+    args = parser.parse_args()
+
+    if args.metrics:
+        metrics.enable()
+
+    output = open(args.output, 'w', newline='') if args.output else sys.stdout
+    try:
+        rows = score_file(args.input, output, bundle_path=args.bundle, chunksize=args.chunksize,
+                          workers=args.workers, threshold=args.threshold,
+                          with_probability=args.with_probability)
+    finally:
+        if args.output:
+            output.close()
+    print(f"Scored {rows} rows", file=sys.stderr)
+
+    if args.metrics:
+        with open(args.metrics, 'w') as f:
+            json.dump(metrics.snapshot(), f, indent=2)
+        print(f"Metrics written to {args.metrics}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
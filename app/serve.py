@@ -0,0 +1,293 @@
+"""Asyncio inference server with dynamic micro-batching.
+
+    python app/serve.py --port 8000 --max-batch-size 64 --max-wait-ms 5
+
+Endpoints (JSON in, JSON out):
+    POST /predict        one raw record -> {"prediction": 0|1, "probability": p}
+    POST /predict/batch  {"records": [...]} -> {"predictions": [...], "probabilities": [...]}
+    GET  /health         -> {"status": "ok", "queued": n}
+    GET  /metrics        stage latency histograms and counters, Prometheus text (--metrics)
+    GET  /metrics.json   the same as JSON, plus /profiles.json for slow-batch stack samples
+
+Single-record requests are queued and flushed to the model as one matrix
+when `max_batch_size` records are waiting or the oldest has waited
+`max_wait_ms`, whichever comes first. Every caller gets its own row of that
+single `predict_proba` call. Records are type-checked before they are queued,
+and if a batch still fails it is rescored record by record so only the bad
+caller sees the error. When `max_queue` records are already waiting
+new requests are rejected with 503 instead of piling up. Batch requests skip
+the queue, so they are bounded separately: more than `max_request_records`
+records is a 400, and more than `max_pending_batches` batches in flight a 503.
+"""
+import argparse
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+import metrics
+from bundle import DEFAULT_BUNDLE_PATH, InferenceBundle
+from preprocessing import CATEGORICAL_COLUMNS, NUMERICAL_COLUMNS
+
+REQUIRED_FIELDS = CATEGORICAL_COLUMNS + NUMERICAL_COLUMNS
+
+
+class Overloaded(Exception):
+    """Raised when the request queue is full."""
+
+
+class MicroBatcher:
+    """Collects single records into batches for `score(records) -> probabilities`."""
+
+    def __init__(self, score, max_batch_size=64, max_wait_ms=5.0, max_queue=1024, max_pending_batches=4,
+                 executor=None):
+        self.score = score
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.queue = asyncio.Queue(maxsize=max_queue)
+        self.max_pending_batches = max_pending_batches
+        self._pending_batches = 0
+        # Model calls run off the event loop; one thread keeps batches in order
+        self.executor = executor or ThreadPoolExecutor(max_workers=1)
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self.executor.shutdown(wait=False)
+
+    async def submit(self, record):
+        """Queue one record and wait for its probability."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        try:
+            self.queue.put_nowait((record, future, loop.time()))
+        except asyncio.QueueFull:
+            metrics.increment('requests_rejected_total')
+            raise Overloaded()
+        return await future
+
+    async def score_many(self, records):
+        """Score an already-formed batch directly, bypassing the queue."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.score, records)
+
+    async def submit_batch(self, records):
+        """Score a client's batch directly, or raise Overloaded if too many are in flight."""
+        if self._pending_batches >= self.max_pending_batches:
+            metrics.increment('requests_rejected_total')
+            raise Overloaded()
+        self._pending_batches += 1
+        try:
+            return await self.score_many(records)
+        finally:
+            self._pending_batches -= 1
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            # Measured from when the oldest record was queued, not from when it was picked up
+            deadline = batch[0][2] + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # Drop callers that disconnected while waiting
+            batch = [(record, future, queued) for record, future, queued in batch if not future.cancelled()]
+            if not batch:
+                continue
+            if metrics.ENABLED:
+                now = loop.time()
+                for _, _, queued in batch:
+                    metrics.observe('queue_wait', now - queued)
+                metrics.increment('batches_total')
+                metrics.increment('batched_records_total', len(batch))
+            try:
+                probabilities = await self.score_many([record for record, _, _ in batch])
+            except Exception:
+                # Find the culprit: rescore one record at a time so only its caller gets the error
+                metrics.increment('batch_fallbacks_total')
+                for record, future, _ in batch:
+                    try:
+                        probability = (await self.score_many([record]))[0]
+                    except Exception as exc:
+                        if not future.done():
+                            future.set_exception(exc)
+                        continue
+                    if not future.done():
+                        future.set_result(float(probability))
+                continue
+            for (_, future, _), probability in zip(batch, probabilities):
+                if not future.done():
+                    future.set_result(float(probability))
+
+
+def validate_record(record):
+    # A malformed record would otherwise fail the whole batch it lands in
+    if not isinstance(record, dict):
+        raise TypeError('record must be a JSON object')
+    missing = [field for field in REQUIRED_FIELDS if field not in record]
+    if missing:
+        raise ValueError(f"missing fields {missing}")
+    record = dict(record)
+    for field in NUMERICAL_COLUMNS:
+        value = record[field]
+        if value is None:
+            continue
+        try:
+            record[field] = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"field {field!r} must be a number or null, got {value!r}")
+    return record
+
+
+def make_scorer(bundle):
+    def score(records):
+        if not records:
+            return []
+        # Runs in the executor thread, so a slow batch's stack samples show the model work
+        with metrics.profile_request('score_batch'):
+            return bundle.predict_proba(pd.DataFrame.from_records(records))
+    return score
+
+
+class InferenceServer:
+    """Minimal HTTP/1.1 front end (keep-alive, Content-Length bodies) for a MicroBatcher."""
+
+    def __init__(self, batcher, threshold=0.5, max_request_records=4096):
+        self.batcher = batcher
+        self.threshold = threshold
+        self.max_request_records = max_request_records
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode('latin-1').split(' ', 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get('content-length', 0)))
+
+                status, payload = await self.route(method, path, body)
+                if isinstance(payload, str):
+                    data, content_type = payload.encode(), 'text/plain; version=0.0.4'
+                else:
+                    data, content_type = json.dumps(payload).encode(), 'application/json'
+                writer.write(
+                    f'HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n'
+                    f'Content-Length: {len(data)}\r\n\r\n'.encode() + data
+                )
+                await writer.drain()
+                if headers.get('connection', '').lower() == 'close':
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def route(self, method, path, body):
+        try:
+            if method == 'GET' and path == '/health':
+                return '200 OK', {'status': 'ok', 'queued': self.batcher.queue.qsize()}
+            if method == 'GET' and path == '/metrics':
+                return '200 OK', metrics.render_prometheus()
+            if method == 'GET' and path == '/metrics.json':
+                return '200 OK', metrics.snapshot()
+            if method == 'GET' and path == '/profiles.json':
+                return '200 OK', metrics.profiles()
+            if method == 'POST' and path == '/predict':
+                with metrics.stage('request_predict'):
+                    probability = await self.batcher.submit(validate_record(json.loads(body)))
+                return '200 OK', {
+                    'prediction': int(probability > self.threshold),
+                    'probability': probability,
+                }
+            if method == 'POST' and path == '/predict/batch':
+                with metrics.stage('request_predict_batch'):
+                    records = json.loads(body)['records']
+                    if len(records) > self.max_request_records:
+                        raise ValueError(f"{len(records)} records exceed the limit of {self.max_request_records}")
+                    records = [validate_record(record) for record in records]
+                    probabilities = [float(p) for p in await self.batcher.submit_batch(records)]
+                return '200 OK', {
+                    'predictions': [int(p > self.threshold) for p in probabilities],
+                    'probabilities': probabilities,
+                }
+            return '404 Not Found', {'error': f'no route for {method} {path}'}
+        except Overloaded:
+            return '503 Service Unavailable', {'error': 'server overloaded, retry later'}
+        except (KeyError, TypeError, ValueError) as exc:
+            return '400 Bad Request', {'error': f'invalid request: {exc}'}
+        except Exception as exc:
+            return '500 Internal Server Error', {'error': str(exc)}
+
+
+async def serve(bundle_path, host, port, max_batch_size, max_wait_ms, max_queue,
+                max_request_records=4096, max_pending_batches=4):
+    start = time.perf_counter()
+    bundle = InferenceBundle.load(bundle_path)
+    print(f"Loaded {bundle_path} in {time.perf_counter() - start:.2f} s")
+
+    batcher = MicroBatcher(make_scorer(bundle), max_batch_size=max_batch_size,
+                           max_wait_ms=max_wait_ms, max_queue=max_queue, max_pending_batches=max_pending_batches)
+    batcher.start()
+    frontend = InferenceServer(batcher, max_request_records=max_request_records)
+    server = await asyncio.start_server(frontend.handle_connection, host, port)
+    print(f"Serving on http://{host}:{port} (batch size {max_batch_size}, wait {max_wait_ms} ms)", flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await batcher.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the depression model over HTTP with micro-batching.')
+    parser.add_argument('--bundle', default=DEFAULT_BUNDLE_PATH)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--max-batch-size', type=int, default=64, help='flush when this many records are queued')
+    parser.add_argument('--max-wait-ms', type=float, default=5.0, help='flush when the oldest record has waited this long')
+    parser.add_argument('--max-queue', type=int, default=1024, help='reject requests with 503 beyond this many queued records')
+    parser.add_argument('--max-request-records', type=int, default=4096, help='largest /predict/batch request accepted')
+    parser.add_argument('--max-pending-batches', type=int, default=4,
+                        help='reject /predict/batch with 503 beyond this many batch requests in flight')
+    parser.add_argument('--metrics', action='store_true', help='record stage timings (also enabled by MHP_METRICS=1)')
+    parser.add_argument('--profile-slow-ms', type=float,
+                        help='keep stack samples of batches slower than this (also MHP_PROFILE_SLOW_MS)')
+    args = parser.parse_args()
+
+    if args.metrics or args.profile_slow_ms:
+        metrics.enable(profile_slow_ms=args.profile_slow_ms)
+
+    try:
+        asyncio.run(serve(args.bundle, args.host, args.port, args.max_batch_size,
+                          args.max_wait_ms, args.max_queue, args.max_request_records, args.max_pending_batches))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,329 @@
+"""Parallel cross-validation and successive-halving search for the boosting models.
+
+    python app/train.py --train data/train.csv --families catboost xgboost lightgbm \
+        --candidates 9 --jobs 4 --threads-per-job 1 --output-dir models/search
+
+Features come from the feature cache, so repeated runs skip the cleaning.
+Each (family, fold) is pinned to one worker process, which builds that
+fold's Pool/DMatrix/Dataset once and reuses it for every candidate and rung;
+a rung submits one job per (family, fold) that fits its surviving
+candidates. Candidates are pruned by successive halving: all start with a
+small round budget, and only the best 1/eta (by mean fold AUC) move on to a
+budget eta times larger, with early stopping on the fold's validation split
+at every rung. The run writes a leaderboard, the out-of-fold predictions of
+the final rung and the winner refitted on all rows as an inference bundle.
+"""
+import argparse
+import json
+import math
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import accuracy_score, roc_auc_score
+from sklearn.model_selection import StratifiedKFold
+
+from bundle import InferenceBundle
+from feature_cache import DEFAULT_CACHE_DIR, FeatureCache
+
+EARLY_STOPPING_ROUNDS = 50
+RANDOM_STATE = 42
+
+SEARCH_SPACES = {
+    'catboost': {
+        'depth': [4, 6, 8],
+        'learning_rate': [0.03, 0.1, 0.2],
+        'l2_leaf_reg': [1, 3, 10],
+    },
+    'xgboost': {
+        'max_depth': [3, 4, 6],
+        'learning_rate': [0.03, 0.1, 0.2],
+        'subsample': [0.8, 1.0],
+        'colsample_bytree': [0.8, 1.0],
+        'min_child_weight': [1, 5],
+    },
+    'lightgbm': {
+        'num_leaves': [15, 31, 63],
+        'learning_rate': [0.03, 0.1, 0.2],
+        'feature_fraction': [0.8, 1.0],
+        'min_child_samples': [20, 50],
+    },
+}
+
+
+# Family adapters: build a fold's native dataset, fit with early stopping, refit for serving
+
+def _catboost_dataset(X, y, threads):
+    from catboost import Pool
+    return Pool(X, y, thread_count=threads)
+
+
+def _catboost_fit(params, train, valid, valid_X, rounds, threads):
+    from catboost import CatBoostClassifier
+    model = CatBoostClassifier(
+        iterations=rounds, loss_function='Logloss', eval_metric='AUC', random_seed=RANDOM_STATE,
+        early_stopping_rounds=EARLY_STOPPING_ROUNDS, thread_count=threads, verbose=False,
+        allow_writing_files=False, **params
+    )
+    model.fit(train, eval_set=valid)
+    return model.predict_proba(valid)[:, 1], model.get_best_iteration()
+
+
+def _catboost_model(params, rounds, threads):
+    from catboost import CatBoostClassifier
+    return CatBoostClassifier(iterations=rounds, loss_function='Logloss', random_seed=RANDOM_STATE,
+                              thread_count=threads, verbose=False, allow_writing_files=False, **params)
+
+
+def _xgboost_dataset(X, y, threads):
+    import xgboost as xgb
+    return xgb.DMatrix(X, label=y, nthread=threads)
+
+
+def _xgboost_fit(params, train, valid, valid_X, rounds, threads):
+    import xgboost as xgb
+    booster = xgb.train(
+        {'objective': 'binary:logistic', 'eval_metric': 'auc', 'nthread': threads,
+         'seed': RANDOM_STATE, **params},
+        train, num_boost_round=rounds, evals=[(valid, 'valid')],
+        early_stopping_rounds=EARLY_STOPPING_ROUNDS, verbose_eval=False,
+    )
+    best = booster.best_iteration
+    return booster.predict(valid, iteration_range=(0, best + 1)), best
+
+
+def _xgboost_model(params, rounds, threads):
+    import xgboost as xgb
+    return xgb.XGBClassifier(objective='binary:logistic', n_estimators=rounds, n_jobs=threads,
+                             random_state=RANDOM_STATE, **params)
+
+
+def _lightgbm_dataset(X, y, threads):
+    import lightgbm as lgb
+    # Binning is done once per fold; pre-filtering would tie the dataset to one min_child_samples
+    return lgb.Dataset(X, label=y, params={'feature_pre_filter': False, 'verbose': -1, 'num_threads': threads},
+                       free_raw_data=False)
+
+
+def _lightgbm_fit(params, train, valid, valid_X, rounds, threads):
+    import lightgbm as lgb
+    with warnings.catch_warnings():
+        # Expected when a constructed Dataset is reused with another candidate's parameters
+        warnings.filterwarnings('ignore', message='Overriding the parameters from Reference Dataset')
+        booster = lgb.train(
+            {'objective': 'binary', 'metric': 'auc', 'num_threads': threads, 'seed': RANDOM_STATE,
+             'verbose': -1, **params},
+            train, num_boost_round=rounds, valid_sets=[valid],
+            callbacks=[lgb.early_stopping(EARLY_STOPPING_ROUNDS, verbose=False)],
+        )
+    best = booster.best_iteration or rounds
+    return booster.predict(valid_X, num_iteration=best), best - 1
+
+
+def _lightgbm_model(params, rounds, threads):
+    import lightgbm as lgb
+    return lgb.LGBMClassifier(objective='binary', n_estimators=rounds, n_jobs=threads,
+                              random_state=RANDOM_STATE, verbose=-1, **params)
+
+
+FAMILIES = {
+    'catboost': (_catboost_dataset, _catboost_fit, _catboost_model),
+    'xgboost': (_xgboost_dataset, _xgboost_fit, _xgboost_model),
+    'lightgbm': (_lightgbm_dataset, _lightgbm_fit, _lightgbm_model),
+}
+
+
+# Worker state: the fold datasets this worker owns, keyed by (family, fold)
+_worker = {}
+
+
+def build_fold(family, fold, X_train, y_train, X_valid, y_valid, threads):
+    """Build one fold's native datasets in the worker that owns (family, fold)."""
+    make_dataset = FAMILIES[family][0]
+    train = make_dataset(X_train, y_train, threads)
+    if family == 'lightgbm':
+        # Validation data must share the training set's bin boundaries
+        valid = train.create_valid(X_valid, label=y_valid)
+    else:
+        valid = make_dataset(X_valid, y_valid, threads)
+    _worker[family, fold] = (train, valid, X_valid, y_valid)
+
+
+def run_fold(family, fold, candidates, rounds, threads):
+    """Fit every (candidate id, params) of one family on one fold and score its validation split."""
+    train, valid, valid_X, y_valid = _worker[family, fold]
+    results = []
+    for candidate, params in candidates:
+        start = time.perf_counter()
+        probability, best_iteration = FAMILIES[family][1](params, train, valid, valid_X, rounds, threads)
+        fit_seconds = time.perf_counter() - start
+        results.append({
+            'family': family,
+            'candidate': candidate,
+            'fold': fold,
+            'auc': roc_auc_score(y_valid, probability),
+            'accuracy': accuracy_score(y_valid, probability > 0.5),
+            'fit_seconds': fit_seconds,
+            'best_iteration': best_iteration,
+            'probability': probability.astype(np.float32),
+        })
+    return results
+
+
+def sample_candidates(families, n_candidates, seed=RANDOM_STATE):
+    """Draw `n_candidates` distinct parameter sets per family from SEARCH_SPACES."""
+    rng = np.random.default_rng(seed)
+    candidates = []
+    for family in families:
+        space = SEARCH_SPACES[family]
+        seen = set()
+        total = math.prod(len(values) for values in space.values())
+        while len(seen) < min(n_candidates, total):
+            params = {name: values[rng.integers(len(values))] for name, values in space.items()}
+            key = json.dumps(params, sort_keys=True, default=float)
+            if key not in seen:
+                seen.add(key)
+                candidates.append((family, len(seen) - 1, params))
+    return candidates
+
+
+def rung_budgets(min_rounds, max_rounds, eta):
+    budgets = [min_rounds]
+    while budgets[-1] < max_rounds:
+        budgets.append(min(budgets[-1] * eta, max_rounds))
+    return budgets
+
+
+def successive_halving(X, y, candidates, n_folds=5, jobs=1, threads_per_job=1,
+                       min_rounds=50, max_rounds=800, eta=3):
+    """Run the search; returns (leaderboard DataFrame, out-of-fold predictions of the last rung)."""
+    folds = list(StratifiedKFold(n_splits=n_folds, shuffle=True, random_state=RANDOM_STATE).split(X, y))
+    params_by_id = {(family, cid): params for family, cid, params in candidates}
+    survivors = [(family, cid) for family, cid, _ in candidates]
+    rows = []
+
+    # Every (family, fold) is pinned to one single-process executor, so its datasets are
+    # built exactly once and reused by every candidate and rung that trains on it
+    pairs = [(family, fold) for family in dict.fromkeys(family for family, _, _ in candidates)
+             for fold in range(n_folds)]
+    with ExitStack() as stack:
+        executors = [stack.enter_context(ProcessPoolExecutor(max_workers=1))
+                     for _ in range(max(1, min(jobs, len(pairs))))]
+        owner = {pair: executors[i % len(executors)] for i, pair in enumerate(pairs)}
+        builds = []
+        for family, fold in pairs:
+            train_index, valid_index = folds[fold]
+            builds.append(owner[family, fold].submit(
+                build_fold, family, fold, X[train_index], y[train_index], X[valid_index], y[valid_index],
+                threads_per_job,
+            ))
+        for future in builds:
+            future.result()
+
+        for rung, rounds in enumerate(rung_budgets(min_rounds, max_rounds, eta)):
+            futures = []
+            for family, fold in pairs:
+                batch = [(cid, params_by_id[family, cid]) for f, cid in survivors if f == family]
+                if batch:
+                    futures.append(owner[family, fold].submit(run_fold, family, fold, batch, rounds, threads_per_job))
+            results = [result for future in futures for result in future.result()]
+
+            by_candidate = {}
+            for result in results:
+                by_candidate.setdefault((result['family'], result['candidate']), []).append(result)
+
+            rung_rows, oof = [], {}
+            for (family, cid), fold_results in by_candidate.items():
+                aucs = [r['auc'] for r in fold_results]
+                rung_rows.append({
+                    'rung': rung,
+                    'rounds': rounds,
+                    'family': family,
+                    'candidate': cid,
+                    'params': json.dumps(params_by_id[family, cid], sort_keys=True),
+                    'auc': np.mean(aucs),
+                    'auc_std': np.std(aucs),
+                    'accuracy': np.mean([r['accuracy'] for r in fold_results]),
+                    'fit_seconds': sum(r['fit_seconds'] for r in fold_results),
+                    'best_iteration': int(np.mean([r['best_iteration'] for r in fold_results])),
+                })
+                prediction = np.empty(len(y), dtype=np.float32)
+                for r in fold_results:
+                    prediction[folds[r['fold']][1]] = r['probability']
+                oof[f'{family}_{cid}'] = prediction
+            rows.extend(rung_rows)
+
+            ranked = sorted(rung_rows, key=lambda row: row['auc'], reverse=True)
+            print(f"Rung {rung}: {len(ranked)} candidates x {n_folds} folds at {rounds} rounds, "
+                  f"best AUC {ranked[0]['auc']:.5f} ({ranked[0]['family']} #{ranked[0]['candidate']})")
+            if rounds >= max_rounds:
+                break
+            keep = max(1, math.ceil(len(ranked) / eta))
+            survivors = [(row['family'], row['candidate']) for row in ranked[:keep]]
+
+    leaderboard = pd.DataFrame(rows).sort_values(['rung', 'auc'], ascending=[False, False])
+    return leaderboard.reset_index(drop=True), oof
+
+
+def fit_winner(X, y, leaderboard, threads):
+    """Refit the top candidate of the last rung on all rows at its early-stopped size."""
+    best = leaderboard.iloc[0]
+    params = json.loads(best['params'])
+    model = FAMILIES[best['family']][2](params, int(best['best_iteration']) + 1, threads)
+    model.fit(X, y)
+    return model, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cross-validated successive-halving search over the boosting models.')
+    parser.add_argument('--train', required=True, help='raw train.csv')
+    parser.add_argument('--families', nargs='+', default=list(FAMILIES), choices=list(FAMILIES))
+    parser.add_argument('--candidates', type=int, default=9, help='parameter sets sampled per family')
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--jobs', type=int, default=max(os.cpu_count() or 1, 1), help='parallel fit jobs')
+    parser.add_argument('--threads-per-job', type=int, default=1, help='library threads inside each job')
+    parser.add_argument('--min-rounds', type=int, default=50, help='boosting rounds at the first rung')
+    parser.add_argument('--max-rounds', type=int, default=800, help='boosting rounds at the last rung')
+    parser.add_argument('--eta', type=int, default=3, help='keep 1/eta of the candidates per rung')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR)
+    parser.add_argument('--output-dir', default=os.path.join(os.path.dirname(__file__), '..', 'models', 'search'))
+    args = parser.parse_args()
+
+    features = FeatureCache(args.cache_dir).load(args.train)
+    X = features.to_numpy(np.float32)
+    y = np.asarray(features.target, dtype=np.int32)
+
+    start = time.perf_counter()
+    candidates = sample_candidates(args.families, args.candidates)
+    leaderboard, oof = successive_halving(
+        X, y, candidates, n_folds=args.folds, jobs=args.jobs, threads_per_job=args.threads_per_job,
+        min_rounds=args.min_rounds, max_rounds=args.max_rounds, eta=args.eta,
+    )
+    search_seconds = time.perf_counter() - start
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    leaderboard.to_csv(os.path.join(args.output_dir, 'leaderboard.csv'), index=False)
+    np.savez_compressed(os.path.join(args.output_dir, 'oof_predictions.npz'), y=y, **oof)
+
+    model, best = fit_winner(X, y, leaderboard, threads=args.jobs * args.threads_per_job)
+    bundle = InferenceBundle(features.cleaner, features.encoder, model, version='search', metadata={
+        'family': best['family'],
+        'params': json.loads(best['params']),
+        'rounds': int(best['best_iteration']) + 1,
+        'cv_auc': float(best['auc']),
+        'cv_accuracy': float(best['accuracy']),
+        'train_rows': len(y),
+    })
+    bundle.save(os.path.join(args.output_dir, 'bundle.joblib'))
+
+    columns = ['rung', 'rounds', 'family', 'candidate', 'auc', 'auc_std', 'accuracy', 'fit_seconds', 'best_iteration']
+    print(leaderboard[columns].head(15).to_string(index=False, float_format=lambda v: f'{v:.5f}'))
+    print(f"\nSearch took {search_seconds:.1f} s; winner: {best['family']} {best['params']}")
+
+
+if __name__ == '__main__':
+    main()
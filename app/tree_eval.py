@@ -0,0 +1,217 @@
+"""Pure-NumPy evaluator for CatBoost's oblivious (symmetric) tree ensembles.
+
+Every tree of a CatBoost model applies the same `depth` splits to all rows,
+so the ensemble fits into three arrays: split feature indices and
+thresholds of shape (n_trees, depth) and leaf values of shape
+(n_trees, 2 ** depth). Scoring packs the split outcomes of each row into a
+leaf index per tree and gathers the leaf values, without importing catboost.
+
+Export a trained model (and a bundle that uses the compiled evaluator):
+
+    python app/tree_eval.py --bundle models/mental_health_bundle_v1.joblib \
+        --output models/mental_health_classifier_v1.npz \
+        --compiled-bundle models/mental_health_bundle_v1_compiled.joblib
+
+The app loads the compiled bundle when it exists, so it never imports catboost.
+"""
+import argparse
+import json
+import os
+import tempfile
+
+import numpy as np
+
+FORMAT_VERSION = 1
+# Below this many rows per block leaf values are gathered in a single call
+SMALL_BATCH = 256
+
+
+class ObliviousTreeEnsemble:
+    """Binary classifier scored from flat split/threshold/leaf arrays.
+
+    `predict_proba` has the same shape and meaning as CatBoost's, so the
+    ensemble can replace the model inside an InferenceBundle.
+    """
+
+    def __init__(self, split_features, thresholds, leaf_values, scale=1.0, bias=0.0,
+                 nan_as_true=None, n_features=None, block_size=4096):
+        self.split_features = np.ascontiguousarray(split_features, dtype=np.int32)
+        self.thresholds = np.ascontiguousarray(thresholds, dtype=np.float32)
+        self.leaf_values = np.ascontiguousarray(leaf_values, dtype=np.float64)
+        self.scale = float(scale)
+        self.bias = float(bias)
+        self.n_features = int(n_features if n_features is not None else self.split_features.max() + 1)
+        self.nan_as_true = (np.zeros(self.n_features, dtype=bool) if nan_as_true is None
+                            else np.asarray(nan_as_true, dtype=bool))
+        self.block_size = block_size
+
+        self._compile()
+
+    def _compile(self):
+        n_trees, depth = self.split_features.shape
+        # Many trees reuse the same (feature, threshold) split: evaluate each distinct one once
+        pairs = np.stack([self.split_features.ravel().astype(np.float64),
+                          self.thresholds.ravel().astype(np.float64)], axis=1)
+        unique, inverse = np.unique(pairs, axis=0, return_inverse=True)
+        self._unique_features = unique[:, 0].astype(np.intp)
+        self._unique_thresholds = unique[:, 1].astype(np.float32)[:, None]
+        self._split_ids = inverse.reshape(n_trees, depth)
+        # Offset of each tree's first leaf in the flattened leaf table
+        self._leaf_offsets = (np.arange(n_trees, dtype=np.intp) << depth)[:, None]
+        self._flat_leaves = self.leaf_values.ravel()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for name in [key for key in state if key.startswith('_')]:
+            del state[name]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._compile()
+
+    @property
+    def n_trees(self):
+        return self.split_features.shape[0]
+
+    @property
+    def depth(self):
+        return self.split_features.shape[1]
+
+    @classmethod
+    def from_catboost(cls, model):
+        """Read the trees out of a fitted CatBoost model via its JSON export."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'model.json')
+            model.save_model(path, format='json')
+            with open(path) as f:
+                dump = json.load(f)
+        return cls.from_json(dump)
+
+    @classmethod
+    def from_json(cls, dump):
+        float_features = dump['features_info']['float_features']
+        flat_index = {f['feature_index']: f['flat_feature_index'] for f in float_features}
+        n_features = max(flat_index.values()) + 1
+        nan_as_true = np.zeros(n_features, dtype=bool)
+        for feature in float_features:
+            nan_as_true[feature['flat_feature_index']] = feature.get('nan_value_treatment') == 'AsTrue'
+
+        trees = dump['oblivious_trees']
+        depth = max(len(tree['splits']) for tree in trees)
+        split_features = np.zeros((len(trees), depth), dtype=np.int32)
+        # Padding splits never fire (x > inf is False), keeping bit 0 for shallower trees
+        thresholds = np.full((len(trees), depth), np.inf, dtype=np.float32)
+        leaf_values = np.zeros((len(trees), 1 << depth), dtype=np.float64)
+
+        for t, tree in enumerate(trees):
+            for d, split in enumerate(tree['splits']):
+                if split['split_type'] != 'FloatFeature':
+                    raise ValueError(f"unsupported split type {split['split_type']!r}, only float features can be compiled")
+                split_features[t, d] = flat_index[split['float_feature_index']]
+                thresholds[t, d] = split['border']
+            values = np.asarray(tree['leaf_values'], dtype=np.float64)
+            if len(values) != 1 << len(tree['splits']):
+                raise ValueError('only single-dimension (binary or regression) leaves are supported')
+            leaf_values[t, :len(values)] = values
+
+        scale, bias = dump.get('scale_and_bias', [1.0, [0.0]])
+        return cls(split_features, thresholds, leaf_values, scale=scale, bias=bias[0],
+                   nan_as_true=nan_as_true, n_features=n_features)
+
+    def save(self, path):
+        np.savez_compressed(
+            path,
+            format_version=np.int32(FORMAT_VERSION),
+            split_features=self.split_features.astype(np.uint8 if self.n_features <= 256 else np.int32),
+            thresholds=self.thresholds,
+            leaf_values=self.leaf_values,
+            scale_and_bias=np.array([self.scale, self.bias]),
+            nan_as_true=self.nan_as_true,
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as arrays:
+            if int(arrays['format_version']) != FORMAT_VERSION:
+                raise ValueError(f"Unsupported tree format {int(arrays['format_version'])} in {path}")
+            scale, bias = arrays['scale_and_bias']
+            nan_as_true = arrays['nan_as_true']
+            return cls(arrays['split_features'], arrays['thresholds'], arrays['leaf_values'],
+                       scale=scale, bias=bias, nan_as_true=nan_as_true, n_features=len(nan_as_true))
+
+    def _prepare(self, X):
+        # CatBoost compares float32 values against float32 borders
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[None, :]
+        missing = np.isnan(X)
+        if missing.any():
+            X = np.where(missing, np.where(self.nan_as_true, np.inf, -np.inf).astype(np.float32), X)
+        return X
+
+    def _leaf_indices(self, X):
+        """Leaf reached in every tree, as a (n_trees, n_rows) uint8 array."""
+        # Tree-major layout: every gather below copies whole contiguous rows
+        columns = np.ascontiguousarray(X.T)
+        bits = (columns[self._unique_features] > self._unique_thresholds).view(np.uint8)
+        if self.depth > 8:
+            bits = bits.astype(np.uint16)
+        leaf = bits[self._split_ids[:, 0]]
+        for d in range(1, self.depth):
+            leaf |= np.left_shift(bits, d)[self._split_ids[:, d]]
+        return leaf
+
+    def decision_function(self, X):
+        """Raw ensemble score (log-odds) for every row of `X`."""
+        X = self._prepare(X)
+        raw = np.empty(len(X), dtype=np.float64)
+        for start in range(0, len(X), self.block_size):
+            leaf = self._leaf_indices(X[start:start + self.block_size])
+            if leaf.shape[1] < SMALL_BATCH:
+                # One gather over the flattened leaf table is cheapest for a few rows
+                values = self._flat_leaves.take(leaf + self._leaf_offsets).sum(axis=0)
+            else:
+                # For many rows, gathering tree by tree from a 2 ** depth table stays in cache
+                values = np.zeros(leaf.shape[1], dtype=np.float64)
+                for tree_leaves, tree_leaf in zip(self.leaf_values, leaf):
+                    values += tree_leaves.take(tree_leaf)
+            raw[start:start + leaf.shape[1]] = values
+        return self.scale * raw + self.bias
+
+    def predict_proba(self, X):
+        positive = 1.0 / (1.0 + np.exp(-self.decision_function(X)))
+        return np.column_stack([1.0 - positive, positive])
+
+    def predict(self, X, threshold=0.5):
+        return (self.predict_proba(X)[:, 1] > threshold).astype(int)
+
+
+def main():
+    from bundle import InferenceBundle
+    from feature_cache import file_digest
+    # Run as a script this module is __main__; pickle the class under its importable name
+    from tree_eval import ObliviousTreeEnsemble
+
+    parser = argparse.ArgumentParser(description="Export a bundle's CatBoost model to flat NumPy arrays.")
+    parser.add_argument('--bundle', required=True, help='inference bundle holding the CatBoost model')
+    parser.add_argument('--output', required=True, help='.npz file to write')
+    parser.add_argument('--compiled-bundle', help='also write a copy of the bundle that scores with the .npz evaluator')
+    args = parser.parse_args()
+
+    bundle = InferenceBundle.load(args.bundle)
+    ensemble = ObliviousTreeEnsemble.from_catboost(bundle.model)
+    ensemble.save(args.output)
+    print(f"Exported {ensemble.n_trees} trees of depth {ensemble.depth} to {args.output}")
+
+    if args.compiled_bundle:
+        compiled = InferenceBundle(bundle.cleaner, bundle.encoder, ObliviousTreeEnsemble.load(args.output),
+                                   version=bundle.version,
+                                   metadata={**bundle.metadata, 'compiled': True,
+                                             # Lets the app detect a compiled bundle left over from an older source
+                                             'source_sha256': file_digest(args.bundle)})
+        compiled.save(args.compiled_bundle)
+
+
+if __name__ == '__main__':
+    main()
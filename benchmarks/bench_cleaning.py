@@ -0,0 +1,195 @@
+"""Check CleaningTransformer against the notebook's row-wise cleaning and time both.
+
+Usage:
+    python benchmarks/bench_cleaning.py [--rows 140700] [--repeat 3] [--csv ../data/train.csv]
+
+The reference functions below are copied from
+notebooks/mental-health-prediction.ipynb. The script fails with an
+AssertionError if the two pipelines disagree on any cell.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+from preprocessing import (  # noqa: E402
+    DEGREE_MAPPING,
+    DIETARY_MAPPING,
+    PROFESSION_STANDARDIZATION,
+    VALID_PROFESSIONS,
+    CleaningTransformer,
+)
+from synthetic import make_raw_frame  # noqa: E402
+
+
+# Reference implementation (notebook cells "Data Cleaning")
+
+def clean_profession(row):
+    if row['Working Professional or Student'] == 'Student':
+        return 'Student'
+    profession = row['Profession']
+    if pd.isna(profession):
+        return 'Unknown'
+    profession = PROFESSION_STANDARDIZATION.get(profession, profession)
+    if profession not in VALID_PROFESSIONS and profession != 'Student':
+        return 'Unknown'
+    return profession
+
+
+def fill_pressure_columns(df):
+    df = df.copy()
+    student_academic_mean = df[df['Working Professional or Student'] == 'Student']['Academic Pressure'].mean()
+    work_prof_work_mean = df[df['Working Professional or Student'] == 'Working Professional']['Work Pressure'].mean()
+    df['Academic Pressure'] = df.apply(
+        lambda row: 0 if row['Working Professional or Student'] == 'Working Professional'
+        else student_academic_mean if pd.isna(row['Academic Pressure'])
+        else row['Academic Pressure'],
+        axis=1
+    )
+    df['Work Pressure'] = df.apply(
+        lambda row: 0 if row['Working Professional or Student'] == 'Student'
+        else work_prof_work_mean if pd.isna(row['Work Pressure'])
+        else row['Work Pressure'],
+        axis=1
+    )
+    return df
+
+
+def fill_cgpa_by_status(df):
+    df = df.copy()
+    student_mean_cgpa = df[df['Working Professional or Student'] == 'Student']['CGPA'].mean()
+    working_prof_mean_cgpa = df[df['Working Professional or Student'] == 'Working Professional']['CGPA'].mean()
+    df['CGPA'] = df.apply(
+        lambda row: working_prof_mean_cgpa if (row['Working Professional or Student'] == 'Working Professional' and pd.isna(row['CGPA']))
+        else student_mean_cgpa if (row['Working Professional or Student'] == 'Student' and pd.isna(row['CGPA']))
+        else row['CGPA'],
+        axis=1
+    )
+    return df
+
+
+def fill_satisfaction_columns(df):
+    df = df.copy()
+    study_satisfaction_mean = df[df['Working Professional or Student'] == 'Student']['Study Satisfaction'].mean()
+    job_satisfaction_mean = df[df['Working Professional or Student'] == 'Working Professional']['Job Satisfaction'].mean()
+    min_value = 1
+    df['Study Satisfaction'] = df.apply(
+        lambda row: study_satisfaction_mean if (row['Working Professional or Student'] == 'Student' and pd.isna(row['Study Satisfaction']))
+        else min_value if pd.isna(row['Study Satisfaction'])
+        else row['Study Satisfaction'],
+        axis=1
+    )
+    df['Job Satisfaction'] = df.apply(
+        lambda row: job_satisfaction_mean if (row['Working Professional or Student'] == 'Working Professional' and pd.isna(row['Job Satisfaction']))
+        else min_value if pd.isna(row['Job Satisfaction'])
+        else row['Job Satisfaction'],
+        axis=1
+    )
+    return df
+
+
+def clean_dietary_habits(df):
+    df = df.copy()
+
+    def standardize_diet(value):
+        if pd.isna(value):
+            return 'Moderate'
+        if isinstance(value, (int, float)):
+            return 'Moderate'
+        value = str(value).strip()
+        return DIETARY_MAPPING.get(value, 'Moderate')
+
+    df['Dietary Habits'] = df['Dietary Habits'].apply(standardize_diet)
+    return df
+
+
+def clean_degree(df):
+    df = df.copy()
+
+    def standardize_degree(value):
+        if pd.isna(value):
+            return 'Unknown'
+        value = str(value).strip()
+        if value.replace('.', '').isdigit():
+            return 'Unknown'
+        return DEGREE_MAPPING.get(value, 'Unknown')
+
+    df['Degree'] = df['Degree'].apply(standardize_degree)
+    return df
+
+
+def clean_rowwise(df):
+    df = df.copy()
+    df['Profession'] = df.apply(clean_profession, axis=1)
+    df = fill_pressure_columns(df)
+    df = fill_cgpa_by_status(df)
+    df = fill_satisfaction_columns(df)
+    df = clean_dietary_habits(df)
+    df = clean_degree(df)
+    mode_value = df['Financial Stress'].mode()[0]
+    df['Financial Stress'] = df['Financial Stress'].fillna(mode_value)
+    return df
+
+
+def clean_vectorized(df):
+    return CleaningTransformer().fit_transform(df)
+
+
+def assert_equivalent(expected, actual):
+    assert list(expected.columns) == list(actual.columns)
+    for column in expected.columns:
+        left, right = expected[column], actual[column]
+        if pd.api.types.is_numeric_dtype(left):
+            np.testing.assert_allclose(
+                left.to_numpy(dtype=float), right.to_numpy(dtype=float),
+                rtol=0, atol=1e-12, equal_nan=True, err_msg=column
+            )
+        else:
+            assert (left.astype(object).to_numpy() == right.astype(object).to_numpy()).all(), column
+
+
+def best_of(func, df, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(df)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=140700, help='synthetic rows to generate')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--csv', help='use a real train.csv/test.csv instead of synthetic data')
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.csv) if args.csv else make_raw_frame(args.rows)
+    print(f"Rows: {len(df)}")
+
+    rowwise_time, expected = best_of(clean_rowwise, df, args.repeat)
+    vectorized_time, actual = best_of(clean_vectorized, df, args.repeat)
+    assert_equivalent(expected, actual)
+
+    # Fitted statistics must carry over to unseen data the same way
+    train, test = df.iloc[: len(df) // 2], df.iloc[len(df) // 2:]
+    cleaner = CleaningTransformer().fit(train)
+    assert np.isclose(
+        cleaner.student_academic_pressure_mean_,
+        train[train['Working Professional or Student'] == 'Student']['Academic Pressure'].mean()
+    )
+    assert not cleaner.transform(test)[['Academic Pressure', 'Work Pressure', 'Financial Stress']].isna().any().any()
+
+    print("Outputs match.")
+    print(f"Row-wise (notebook): {rowwise_time:8.3f} s")
+    print(f"Vectorized:          {vectorized_time:8.3f} s")
+    print(f"Speed-up:            {rowwise_time / vectorized_time:8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""Compare the NumPy oblivious-tree evaluator with native CatBoost.
+
+    python benchmarks/bench_tree_eval.py [--rows 140700] [--csv ../data/train.csv]
+
+Trains the notebook's CatBoost configuration (500 iterations, depth 6) on the
+prepared features, checks that the exported evaluator reproduces CatBoost's
+probabilities to within 1e-6 on the held-out split, then times
+`predict_proba` for batch sizes from 1 to 100k and the cold start of both.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+
+APP_DIR = os.path.join(os.path.dirname(__file__), '..', 'app')
+sys.path.insert(0, APP_DIR)
+
+from bundle import InferenceBundle  # noqa: E402
+from preprocessing import TARGET_COLUMN  # noqa: E402
+from synthetic import make_raw_frame  # noqa: E402
+from tree_eval import ObliviousTreeEnsemble  # noqa: E402
+
+BATCH_SIZES = [1, 10, 100, 1000, 10000, 100000]
+
+
+def time_call(func, X, min_time=0.2):
+    """Best per-call time over repeated calls (at least `min_time` seconds in total)."""
+    best, total, calls = np.inf, 0.0, 0
+    while total < min_time or calls < 3:
+        start = time.perf_counter()
+        func(X)
+        elapsed = time.perf_counter() - start
+        best, total, calls = min(best, elapsed), total + elapsed, calls + 1
+    return best
+
+
+def cold_start(code):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', code], check=True, cwd=APP_DIR)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=140700, help='synthetic rows to generate')
+    parser.add_argument('--csv', help='use a real train.csv instead of synthetic data')
+    args = parser.parse_args()
+
+    from catboost import CatBoostClassifier
+
+    raw = pd.read_csv(args.csv) if args.csv else make_raw_frame(args.rows)
+    bundle = InferenceBundle.fit(raw, model=None)
+    X = bundle.transform(raw)
+    y = raw[TARGET_COLUMN].to_numpy()
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+
+    model = CatBoostClassifier(iterations=500, learning_rate=0.1, depth=6, l2_leaf_reg=3,
+                               loss_function='Logloss', random_seed=42, verbose=False, allow_writing_files=False)
+    model.fit(X_train, y_train)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        npz_path = os.path.join(tmp, 'model.npz')
+        cbm_path = os.path.join(tmp, 'model.cbm')
+        ObliviousTreeEnsemble.from_catboost(model).save(npz_path)
+        model.save_model(cbm_path)
+        ensemble = ObliviousTreeEnsemble.load(npz_path)
+
+        difference = np.abs(ensemble.predict_proba(X_test) - model.predict_proba(X_test)).max()
+        print(f"Trees: {ensemble.n_trees}, depth {ensemble.depth}, .npz size {os.path.getsize(npz_path) / 1024:.1f} KiB")
+        print(f"Max |p_numpy - p_catboost| on {len(X_test)} held-out rows: {difference:.2e}")
+        assert difference < 1e-6
+
+        native_start = cold_start(
+            f"from catboost import CatBoostClassifier; CatBoostClassifier().load_model({cbm_path!r})")
+        numpy_start = cold_start(
+            f"from tree_eval import ObliviousTreeEnsemble; ObliviousTreeEnsemble.load({npz_path!r})")
+
+    print(f"\nCold start (import + load): catboost {native_start * 1000:.0f} ms, numpy {numpy_start * 1000:.0f} ms")
+    print(f"\n{'batch':>7} {'catboost ms':>12} {'numpy ms':>10} {'speed-up':>9}")
+    pool = np.concatenate([X_test] * int(np.ceil(max(BATCH_SIZES) / len(X_test))))
+    for size in BATCH_SIZES:
+        batch = pool[:size]
+        native = time_call(model.predict_proba, batch)
+        compiled = time_call(ensemble.predict_proba, batch)
+        print(f"{size:>7} {native * 1000:>12.3f} {compiled * 1000:>10.3f} {native / compiled:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""Load-test app/serve.py at several micro-batching settings.
+
+    python benchmarks/load_test.py --bundle models/mental_health_bundle_v1.joblib \
+        --settings 1:0 16:2 64:5 --concurrency 64 --duration 10
+
+For every `max_batch_size:max_wait_ms` pair a fresh server is started, a
+pool of keep-alive clients sends single-record `/predict` requests for
+`--duration` seconds, and p50/p99 latency and requests/second are reported.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from synthetic import make_raw_frame
+
+SERVE = os.path.join(os.path.dirname(__file__), '..', 'app', 'serve.py')
+
+
+def sample_records(n):
+    frame = make_raw_frame(n, seed=0, with_target=False).drop(columns=['id', 'Name'])
+    # JSON has no NaN, missing answers are sent as null
+    return json.loads(frame.to_json(orient='records'))
+
+
+async def client(host, port, records, stop_at, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    i = 0
+    try:
+        while time.perf_counter() < stop_at:
+            body = json.dumps(records[i % len(records)]).encode()
+            i += 1
+            start = time.perf_counter()
+            writer.write(
+                b'POST /predict HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n'
+                + f'Content-Length: {len(body)}\r\n\r\n'.encode() + body
+            )
+            await writer.drain()
+            status = await reader.readline()
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b''):
+                    break
+                if line.lower().startswith(b'content-length:'):
+                    length = int(line.split(b':')[1])
+            await reader.readexactly(length)
+            if b' 200 ' in status:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors.append(status.decode().strip())
+    finally:
+        writer.close()
+
+
+async def run_load(host, port, records, concurrency, duration):
+    latencies, errors = [], []
+    start = time.perf_counter()
+    stop_at = start + duration
+    await asyncio.gather(*(
+        client(host, port, records[i::concurrency], stop_at, latencies, errors)
+        for i in range(concurrency)
+    ))
+    return latencies, errors, time.perf_counter() - start
+
+
+def wait_for_server(process, host, port, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError('server exited during start-up')
+        try:
+            asyncio.run(asyncio.wait_for(asyncio.open_connection(host, port), 1))
+            return
+        except (OSError, asyncio.TimeoutError):
+            time.sleep(0.2)
+    raise RuntimeError('server did not start in time')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load-test the micro-batching inference server.')
+    parser.add_argument('--bundle', required=True)
+    parser.add_argument('--settings', nargs='+', default=['1:0', '16:2', '64:5'],
+                        help='max_batch_size:max_wait_ms pairs to compare')
+    parser.add_argument('--concurrency', type=int, default=64, help='simultaneous keep-alive clients')
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds per setting')
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    host = '127.0.0.1'
+    records = sample_records(max(args.concurrency * 16, 1000))
+
+    print(f"{'batch':>6} {'wait ms':>8} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for setting in args.settings:
+        batch_size, wait_ms = setting.split(':')
+        process = subprocess.Popen(
+            [sys.executable, SERVE, '--bundle', args.bundle, '--host', host, '--port', str(args.port),
+             '--max-batch-size', batch_size, '--max-wait-ms', wait_ms],
+            stdout=subprocess.DEVNULL,
+        )
+        try:
+            wait_for_server(process, host, args.port)
+            latencies, errors, elapsed = asyncio.run(
+                run_load(host, args.port, records, args.concurrency, args.duration)
+            )
+        finally:
+            process.terminate()
+            process.wait()
+
+        latencies_ms = np.array(latencies) * 1000
+        p50, p99 = np.percentile(latencies_ms, [50, 99]) if len(latencies_ms) else (np.nan, np.nan)
+        print(f"{batch_size:>6} {wait_ms:>8} {len(latencies) / elapsed:>9.1f} {p50:>8.2f} {p99:>8.2f} {len(errors):>7}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,275 @@
+"""Inference and training benchmark suite with regression checks.
+
+    python benchmarks/run_benchmarks.py --output results.json
+    python benchmarks/run_benchmarks.py --save-baseline            # writes benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --compare benchmarks/baseline.json --tolerance 0.25
+
+All inputs are synthetic rows generated from the train.csv schema. By default
+a model is trained with the notebook's CatBoost settings; pass --bundle to
+measure a real inference bundle instead. With --compare the run exits with
+status 1 if any metric is worse than the baseline by more than its
+tolerance (a fraction: 0.25 allows 25% slower or 25% less throughput), or
+if a baseline metric was not measured at all. Runs with a different
+workload (rows, rss_rows, bundle) than the baseline are not compared.
+
+Every measurement is repeated in `--rounds` interleaved rounds and the best
+value is kept; cold-start metrics (model load, app import) run in fresh
+interpreters.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from importlib import metadata
+
+import numpy as np
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.join(HERE, '..', 'app')
+sys.path.insert(0, APP_DIR)
+
+from bundle import InferenceBundle  # noqa: E402
+from preprocessing import DROP_COLUMNS, TARGET_COLUMN  # noqa: E402
+from synthetic import make_raw_frame  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(HERE, 'baseline.json')
+# Bumped whenever a metric changes meaning; results of different formats are not compared
+RESULTS_FORMAT = 2
+# Fresh interpreters per cold-start measurement and round (the fastest one is reported)
+PROCESS_REPEAT = 3
+BATCH_SIZES = [1, 16, 256, 4096, 65536]
+LIBRARIES = ['numpy', 'pandas', 'scikit-learn', 'catboost', 'xgboost', 'lightgbm', 'streamlit', 'joblib']
+
+# Notebook settings for every model family
+TRAINING_CONFIGS = {
+    'catboost': ({'learning_rate': 0.1, 'depth': 6, 'l2_leaf_reg': 3}, 500),
+    'xgboost': ({'learning_rate': 0.1, 'max_depth': 4}, 100),
+    'lightgbm': ({}, 100),
+}
+
+
+def best_time(func, repeat=20, min_time=0.2):
+    """Fastest wall time of `func()` over at least `repeat` calls and `min_time` seconds.
+
+    The minimum is far less sensitive to scheduler noise than the mean, which
+    keeps the regression check from flagging random slow runs.
+    """
+    func()  # warm-up
+    timings = []
+    while len(timings) < repeat or sum(timings) < min_time:
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run_python(code, cwd=APP_DIR):
+    result = subprocess.run([sys.executable, '-c', code], cwd=cwd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr else 'child failed')
+    return result.stdout.strip()
+
+
+def best_process_time(code, repeat=PROCESS_REPEAT):
+    """Fastest of `repeat` fresh interpreters running `code`, which prints its duration last."""
+    return min(float(run_python(code).splitlines()[-1]) for _ in range(repeat))
+
+
+def train_reference_bundle(raw, path):
+    from catboost import CatBoostClassifier
+
+    bundle = InferenceBundle.fit(raw, model=None, version='benchmark')
+    params, rounds = TRAINING_CONFIGS['catboost']
+    bundle.model = CatBoostClassifier(iterations=rounds, random_seed=42, verbose=False,
+                                      allow_writing_files=False, **params)
+    bundle.model.fit(bundle.transform(raw), raw[TARGET_COLUMN])
+    bundle.save(path)
+
+
+def app_record(raw):
+    # The same raw dict app.py builds from its form
+    return raw.drop(columns=DROP_COLUMNS + [TARGET_COLUMN]).iloc[0].to_dict()
+
+
+def bench_inference(bundle_path, raw, results):
+    # Cold load in a fresh interpreter, including the model library import it triggers
+    results['model_load_s'] = best_process_time(
+        'import time\n'
+        'from bundle import InferenceBundle\n'
+        't = time.perf_counter()\n'
+        f'InferenceBundle.load({bundle_path!r})\n'
+        'print(time.perf_counter() - t)\n'
+    )
+    bundle = InferenceBundle.load(bundle_path)
+
+    record = app_record(raw)
+    results['feature_construction_s'] = best_time(lambda: bundle.transform(pd.DataFrame([record])))
+    frame = pd.DataFrame([record])
+    results['predict_proba_single_s'] = best_time(lambda: bundle.predict_proba(frame))
+
+    pool = raw.drop(columns=[TARGET_COLUMN])
+    pool = pd.concat([pool] * int(np.ceil(max(BATCH_SIZES) / len(pool))), ignore_index=True)
+    for size in BATCH_SIZES:
+        batch = pool.iloc[:size]
+        features = bundle.transform(batch)
+        model_time = best_time(lambda: bundle.model.predict_proba(features), repeat=10, min_time=1.0)
+        end_to_end = best_time(lambda: bundle.predict_proba(batch), repeat=10, min_time=1.0)
+        results[f'predict_proba_batch_{size}_s'] = model_time
+        results[f'throughput_batch_{size}_rows_per_s'] = size / end_to_end
+
+
+def bench_app_import(results):
+    # Importing app.py runs its module-level Streamlit calls, which work outside `streamlit run`
+    code = 'import time; t = time.perf_counter(); import app; print(time.perf_counter() - t)'
+    try:
+        results['app_import_s'] = best_process_time(code)
+    except RuntimeError as exc:
+        print(f"Skipping app import time: {exc}", file=sys.stderr)
+
+
+def bench_peak_rss(bundle_path, rows, results):
+    code = (
+        'import resource, sys, pandas as pd\n'
+        f'sys.path.insert(0, {HERE!r})\n'
+        'from bundle import InferenceBundle\n'
+        'from synthetic import make_raw_frame\n'
+        f'frame = make_raw_frame({rows}, seed=1, with_target=False)\n'
+        f'InferenceBundle.load({bundle_path!r}).predict_proba(frame)\n'
+        'print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)\n'
+    )
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    scale = 1 if sys.platform == 'darwin' else 1024
+    results[f'peak_rss_score_{rows}_mb'] = int(run_python(code).splitlines()[-1]) * scale / 2 ** 20
+
+
+def bench_training(raw, families, results):
+    from train import FAMILIES
+
+    bundle = InferenceBundle.fit(raw, model=None)
+    X, y = bundle.transform(raw).astype(np.float32), raw[TARGET_COLUMN].to_numpy()
+    for family in families:
+        params, rounds = TRAINING_CONFIGS[family]
+        model = FAMILIES[family][2](params, rounds, os.cpu_count() or 1)
+        start = time.perf_counter()
+        model.fit(X, y)
+        results[f'train_{family}_s'] = time.perf_counter() - start
+
+
+def environment():
+    versions = {}
+    for name in LIBRARIES:
+        try:
+            versions[name] = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            versions[name] = None
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'libraries': versions,
+    }
+
+
+def higher_is_better(metric):
+    return 'throughput' in metric
+
+
+def compare(results, baseline, tolerance, overrides):
+    """Return the metrics that regressed past their tolerance, as printable lines."""
+    regressions = []
+    print(f"\n{'metric':<40} {'baseline':>12} {'current':>12} {'change':>8}")
+    for metric, old in baseline['metrics'].items():
+        new = results['metrics'].get(metric)
+        if new is None:
+            # A skipped measurement must not pass the gate silently
+            print(f"{metric:<40} {old:>12.6g} {'missing':>12}  REGRESSION")
+            regressions.append(f"{metric}: missing from this run")
+            continue
+        if not old:
+            continue
+        change = (new - old) / old
+        worse = -change if higher_is_better(metric) else change
+        limit = overrides.get(metric, tolerance)
+        flag = '  REGRESSION' if worse > limit else ''
+        print(f"{metric:<40} {old:>12.6g} {new:>12.6g} {change:>+8.1%}{flag}")
+        if worse > limit:
+            regressions.append(f"{metric}: {old:.6g} -> {new:.6g} ({change:+.1%}, limit {limit:.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark feature construction, inference and training.')
+    parser.add_argument('--bundle', help='inference bundle to measure (default: train one on synthetic data)')
+    parser.add_argument('--rows', type=int, default=20000, help='synthetic rows for training and scoring')
+    parser.add_argument('--rss-rows', type=int, default=100000, help='rows scored while measuring peak RSS')
+    parser.add_argument('--families', nargs='*', default=list(TRAINING_CONFIGS),
+                        help='model families to time end-to-end training for (none to skip)')
+    parser.add_argument('--rounds', type=int, default=3,
+                        help='repeat every measurement this many times, spread over the run, and keep the best')
+    parser.add_argument('--output', help='write results JSON here')
+    parser.add_argument('--save-baseline', action='store_true', help=f'write results to {DEFAULT_BASELINE}')
+    parser.add_argument('--compare', metavar='BASELINE', help='fail if results regress against this JSON')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed fractional regression')
+    parser.add_argument('--metric-tolerance', action='append', default=[], metavar='METRIC=FRACTION',
+                        help='per-metric tolerance override, may be repeated')
+    args = parser.parse_args()
+
+    config = {'format': RESULTS_FORMAT, 'rows': args.rows, 'rss_rows': args.rss_rows, 'bundle': args.bundle}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        # Timings of different workloads (or an older metric format) are not comparable
+        if baseline.get('config') != config:
+            sys.exit(f"Refusing to compare: baseline config {baseline.get('config')} differs from {config}")
+
+    raw = make_raw_frame(args.rows)
+    metrics = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        bundle_path = args.bundle
+        if bundle_path is None:
+            bundle_path = os.path.join(tmp, 'bundle.joblib')
+            train_reference_bundle(raw, bundle_path)
+        # A busy host slows down whole stretches of the run, which the best-of
+        # inside one measurement cannot see past; rounds interleave the metrics
+        for _ in range(args.rounds):
+            measured = {}
+            bench_inference(bundle_path, raw, measured)
+            bench_peak_rss(bundle_path, args.rss_rows, measured)
+            bench_app_import(measured)
+            bench_training(raw, args.families, measured)
+            for metric, value in measured.items():
+                best = max if higher_is_better(metric) else min
+                metrics[metric] = best(metrics[metric], value) if metric in metrics else value
+
+    results = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'config': config,
+        'rounds': args.rounds,
+        'environment': environment(),
+        'metrics': metrics,
+    }
+    for metric, value in metrics.items():
+        print(f"{metric:<40} {value:>12.6g}")
+
+    for path in filter(None, [args.output, DEFAULT_BASELINE if args.save_baseline else None]):
+        with open(path, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {path}")
+
+    if args.compare:
+        overrides = {name: float(value) for name, value in
+                     (item.split('=', 1) for item in args.metric_tolerance)}
+        regressions = compare(results, baseline, args.tolerance, overrides)
+        if regressions:
+            print('\nRegressions:\n  ' + '\n  '.join(regressions))
+            sys.exit(1)
+        print('\nNo regressions.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""Synthetic data with the same schema and quirks as the competition's train.csv.
+
+The Kaggle files are not committed, so the benchmarks generate frames that
+look like them: the same columns, the same kinds of messy categorical values
+and the same pattern of missing values per status group.
+"""
+import numpy as np
+import pandas as pd
+
+CITIES = [
+    'Kalyan', 'Patna', 'Vasai-Virar', 'Kolkata', 'Ahmedabad', 'Meerut', 'Ludhiana',
+    'Pune', 'Rajkot', 'Visakhapatnam', 'Srinagar', 'Mumbai', 'Indore', 'Agra',
+    'Surat', 'Varanasi', 'Vadodara', 'Hyderabad', 'Kanpur', 'Jaipur', 'Thane',
+    'Lucknow', 'Nagpur', 'Bangalore', 'Chennai', 'Ghaziabad', 'Delhi', 'Bhopal',
+    'Faridabad', 'Nashik', 'Less Delhi', 'Ishanabad', 'M.Tech', '3.0',
+]
+PROFESSIONS = [
+    'Teacher', 'Content Writer', 'Architect', 'Consultant', 'HR Manager', 'Pharmacist',
+    'Doctor', 'Business Analyst', 'Entrepreneur', 'Chemist', 'Chef', 'Educational Consultant',
+    'Data Scientist', 'Researcher', 'Lawyer', 'Customer Support', 'Marketing Manager',
+    'Pilot', 'Travel Consultant', 'Plumber', 'Sales Executive', 'Manager', 'Judge',
+    'Electrician', 'Financial Analyst', 'Software Engineer', 'Civil Engineer',
+    'UX/UI Designer', 'Digital Marketer', 'Accountant', 'Finanancial Analyst',
+    'Mechanical Engineer', 'Graphic Designer', 'Research Analyst', 'Investment Banker',
+    'Medical Doctor', 'Academic', 'Profession', 'Student', 'Pranav', 'B.Ed', 'Moderate',
+]
+SLEEP_DURATIONS = [
+    'More than 8 hours', 'Less than 5 hours', '5-6 hours', '7-8 hours', '1-2 hours',
+    '6-8 hours', '4-6 hours', '6-7 hours', '10-11 hours', 'Moderate', 'No', '55-66 hours',
+]
+DIETARY_HABITS = [
+    'Healthy', 'Unhealthy', 'Moderate', 'Yes', 'No', 'More Healthy', 'Less Healthy',
+    'Less than Healthy', 'No Healthy', 'Pratham', 'BSc', 'Gender', '3', '1.0', 'Mihir',
+]
+DEGREES = [
+    'BHM', 'LLB', 'B.Pharm', 'BBA', 'MCA', 'MD', 'BSc', 'ME', 'B.Arch', 'BCA', 'BE',
+    'MA', 'B.Ed', 'B.Com', 'MBA', 'M.Com', 'MHM', 'BA', 'Class 12', 'M.Tech', 'PhD',
+    'M.Ed', 'MSc', 'B.Tech', 'LLM', 'MBBS', 'M.Pharm', 'M.Arch', 'BPharm', 'BArch',
+    'LCA', 'B BA', 'Kavya', 'Nalini', 'Vivaan', '5.65', '7.06', 'Bhopal', 'Mthanya',
+]
+NAMES = ['Aaradhya', 'Vivan', 'Yuvraj', 'Rhea', 'Vani', 'Ritvik', 'Rajveer', 'Aishwarya']
+
+RAW_COLUMNS = [
+    'id', 'Name', 'Gender', 'Age', 'City', 'Working Professional or Student',
+    'Profession', 'Academic Pressure', 'Work Pressure', 'CGPA', 'Study Satisfaction',
+    'Job Satisfaction', 'Sleep Duration', 'Dietary Habits', 'Degree',
+    'Have you ever had suicidal thoughts ?', 'Work/Study Hours', 'Financial Stress',
+    'Family History of Mental Illness', 'Depression',
+]
+
+
+def _choice(rng, values, n, head_weight=0.9):
+    # The first few values carry most of the mass, the rest is the long tail of typos
+    values = np.asarray(values, dtype=object)
+    head = max(len(values) // 2, 1)
+    weights = np.where(np.arange(len(values)) < head, head_weight / head,
+                       (1 - head_weight) / max(len(values) - head, 1))
+    return rng.choice(values, size=n, p=weights / weights.sum())
+
+
+def _with_missing(rng, values, rate):
+    values = values.astype(float)
+    values[rng.random(len(values)) < rate] = np.nan
+    return values
+
+
+def make_raw_frame(n_rows, seed=42, start_id=0, with_target=True):
+    """Return `n_rows` of raw, uncleaned records shaped like train.csv."""
+    rng = np.random.default_rng(seed)
+    is_student = rng.random(n_rows) < 0.2
+    status = np.where(is_student, 'Student', 'Working Professional')
+
+    profession = _choice(rng, PROFESSIONS, n_rows).astype(object)
+    profession[is_student & (rng.random(n_rows) < 0.97)] = np.nan
+    profession[~is_student & (rng.random(n_rows) < 0.05)] = np.nan
+
+    def by_group(group, rate_in, rate_out, low, high):
+        values = rng.integers(low, high + 1, n_rows).astype(float)
+        missing = np.where(group, rate_in, rate_out)
+        values[rng.random(n_rows) < missing] = np.nan
+        return values
+
+    cgpa = np.round(rng.uniform(5.0, 10.0, n_rows), 2)
+    cgpa[~is_student | (rng.random(n_rows) < 0.001)] = np.nan
+
+    dietary = _choice(rng, DIETARY_HABITS, n_rows).astype(object)
+    dietary[rng.random(n_rows) < 0.0001] = np.nan
+    degree = _choice(rng, DEGREES, n_rows).astype(object)
+    degree[rng.random(n_rows) < 0.0001] = np.nan
+
+    frame = pd.DataFrame({
+        'id': np.arange(start_id, start_id + n_rows),
+        'Name': _choice(rng, NAMES, n_rows),
+        'Gender': rng.choice(['Male', 'Female'], n_rows),
+        'Age': np.where(is_student, rng.integers(18, 35, n_rows), rng.integers(18, 61, n_rows)).astype(float),
+        'City': _choice(rng, CITIES, n_rows),
+        'Working Professional or Student': status,
+        'Profession': profession,
+        'Academic Pressure': by_group(is_student, 0.0002, 0.9999, 1, 5),
+        'Work Pressure': by_group(~is_student, 0.0002, 0.9999, 1, 5),
+        'CGPA': cgpa,
+        'Study Satisfaction': by_group(is_student, 0.0002, 0.9999, 1, 5),
+        'Job Satisfaction': by_group(~is_student, 0.0002, 0.9999, 1, 5),
+        'Sleep Duration': _choice(rng, SLEEP_DURATIONS, n_rows, head_weight=0.98),
+        'Dietary Habits': dietary,
+        'Degree': degree,
+        'Have you ever had suicidal thoughts ?': rng.choice(['Yes', 'No'], n_rows),
+        'Work/Study Hours': rng.integers(0, 13, n_rows).astype(float),
+        'Financial Stress': _with_missing(rng, rng.integers(1, 6, n_rows), 0.00003),
+        'Family History of Mental Illness': rng.choice(['Yes', 'No'], n_rows),
+    })
+    if with_target:
+        risk = (
+            np.where(is_student, 1.5, -1.5)
+            + np.where(frame['Have you ever had suicidal thoughts ?'] == 'Yes', 1.0, -1.0)
+            + 0.4 * (frame['Financial Stress'].fillna(3) - 3)
+            - 0.05 * (frame['Age'] - 35)
+        )
+        frame['Depression'] = (rng.random(n_rows) < 1 / (1 + np.exp(-risk))).astype(int)
+    return frame